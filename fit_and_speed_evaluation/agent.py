@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import platform
+import socket
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from benchmark import DEFAULT_PROMPT, benchmark_rows, get_installed_models, run_model_benchmark
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ollama_client import OllamaClient, get_client, set_client
+
+# Per-board benchmark agent. Runs the benchmark.py workload on request from
+# controller.py and reports results tagged with this board's hardware facts.
+#
+#   GET  /facts      hardware facts
+#   POST /jobs       start a job: {"models": [...], "prompt": "...", "num_runs": 4}
+#   GET  /jobs/<id>  job status and, once done, its result rows
+
+
+def read_first(path):
+    try:
+        with open(path, 'r') as file:
+            return file.read().strip().strip('\x00')
+    except OSError:
+        return None
+
+
+def cpu_model():
+    """CPU model name; ARM boards report it under different keys."""
+    models = {}
+    cpuinfo = read_first('/proc/cpuinfo') or ''
+    for line in cpuinfo.splitlines():
+        key, _, value = line.partition(':')
+        key = key.strip()
+        if key in ('model name', 'Hardware', 'Model', 'CPU part') and key not in models:
+            models[key] = value.strip()
+    for key in ('model name', 'Model', 'Hardware', 'CPU part'):
+        if key in models:
+            return models[key]
+    return platform.processor() or platform.machine()
+
+
+def total_ram_mb():
+    meminfo = read_first('/proc/meminfo') or ''
+    for line in meminfo.splitlines():
+        if line.startswith('MemTotal:'):
+            return int(line.split()[1]) // 1024
+    return None
+
+
+def hardware_facts(device_name=None):
+    """Collect the facts every result is tagged with."""
+    try:
+        ollama_version = get_client().version()
+    except requests.exceptions.RequestException:
+        ollama_version = None
+    return {
+        'device': device_name or socket.gethostname(),
+        'hostname': socket.gethostname(),
+        'board': read_first('/proc/device-tree/model'),
+        'cpu_model': cpu_model(),
+        'cpu_count': os.cpu_count(),
+        'ram_mb': total_ram_mb(),
+        'kernel': platform.release(),
+        'arch': platform.machine(),
+        'ollama_version': ollama_version
+    }
+
+
+class JobRunner:
+    """Runs benchmark jobs one at a time so they don't skew each other."""
+
+    def __init__(self, device_name=None):
+        self.device_name = device_name
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.run_lock = threading.Lock()
+
+    def submit(self, spec):
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.jobs[job_id] = {'id': job_id, 'status': 'queued', 'spec': spec}
+        threading.Thread(target=self._run, args=(job_id, spec), daemon=True).start()
+        return job_id
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            self.jobs[job_id].update(fields)
+
+    def _run(self, job_id, spec):
+        with self.run_lock:
+            self._update(job_id, status='running', started_at=time.time())
+            try:
+                models = spec.get('models') or get_installed_models()
+                prompt = spec.get('prompt') or DEFAULT_PROMPT
+                num_runs = int(spec.get('num_runs', 4))
+                rows = []
+                for model in models:
+                    print(f"\nBenchmarking {model}...")
+                    results, avg_tokens_per_sec, avg_total_tokens = run_model_benchmark(model, prompt, num_runs)
+                    rows.extend(benchmark_rows(model, results, avg_tokens_per_sec, avg_total_tokens))
+                self._update(job_id, status='done', finished_at=time.time(), rows=rows,
+                             facts=hardware_facts(self.device_name))
+            except Exception as e:
+                self._update(job_id, status='failed', finished_at=time.time(), error=str(e))
+
+
+def make_handler(runner):
+    class AgentHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/facts':
+                self._send_json(200, hardware_facts(runner.device_name))
+            elif self.path.startswith('/jobs/'):
+                job = runner.get(self.path[len('/jobs/'):])
+                if job:
+                    self._send_json(200, job)
+                else:
+                    self._send_json(404, {'error': 'unknown job'})
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/jobs':
+                self._send_json(404, {'error': 'not found'})
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                spec = json.loads(self.rfile.read(length) or b'{}')
+            except json.JSONDecodeError:
+                self._send_json(400, {'error': 'invalid JSON'})
+                return
+            self._send_json(202, {'id': runner.submit(spec)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return AgentHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark agent for one board.")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--device-name', default=None,
+                        help="Name results are filed under (defaults to the hostname)")
+    parser.add_argument('--ollama-url', default=None,
+                        help="Ollama server to benchmark, e.g. when several agents share one host")
+    args = parser.parse_args()
+
+    if args.ollama_url:
+        set_client(OllamaClient(args.ollama_url))
+
+    runner = JobRunner(args.device_name)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(runner))
+    print(f"Agent for {args.device_name or socket.gethostname()} listening on {args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping agent...")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
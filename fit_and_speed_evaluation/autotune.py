@@ -0,0 +1,176 @@
+import argparse
+import glob
+import itertools
+import json
+import math
+import os
+import socket
+import sys
+import uuid
+from datetime import datetime
+
+import requests
+
+from agent import cpu_model
+from benchmark import get_installed_models
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ollama_client import OllamaClient, load_profile, profile_path
+
+# Per-device Ollama runtime-option autotuner. Searches num_thread, num_batch,
+# use_mmap and num_gpu with successive halving, measuring prefill and decode
+# throughput, and saves the best options per model to profiles/<hostname>.json,
+# which ollama_client applies automatically.
+
+# A RAG-sized prompt so prefill is measured on a realistic number of tokens
+TUNE_PROMPT = (
+    "Use the context to answer the question.\n\nContext:\n"
+    + "Small language models can run on single-board computers when quantized. "
+      "Throughput depends on memory bandwidth, thread placement and batch size. " * 12
+    + "\nQuestion: What limits throughput on a single-board computer?\nAnswer:"
+)
+
+
+def core_clusters():
+    """Return CPU core counts grouped by max frequency, fastest cluster first.
+
+    big.LITTLE SoCs like the RK3588 report e.g. [4, 4] (A76, A55).
+    """
+    clusters = {}
+    for path in glob.glob('/sys/devices/system/cpu/cpu[0-9]*/cpufreq/cpuinfo_max_freq'):
+        try:
+            with open(path, 'r') as file:
+                max_freq = int(file.read().strip())
+        except (OSError, ValueError):
+            continue
+        clusters[max_freq] = clusters.get(max_freq, 0) + 1
+    if not clusters:
+        return [os.cpu_count() or 1]
+    return [clusters[freq] for freq in sorted(clusters, reverse=True)]
+
+
+def thread_candidates():
+    """Thread counts worth trying: big cores only, all cores, and in between."""
+    clusters = core_clusters()
+    total = sum(clusters)
+    candidates = {clusters[0], total, max(1, total - 1), max(1, total // 2)}
+    if len(clusters) > 1:
+        candidates.add(clusters[0] + clusters[1] // 2)
+    return sorted(candidates)
+
+
+def search_space(num_batch, use_mmap, num_gpu):
+    """All option combinations to try.
+
+    num_ctx is left at the runtime default: ollama_client never applies a
+    tuned context size, so tuning must run with the one callers get.
+    """
+    keys = ['num_thread', 'num_batch', 'use_mmap', 'num_gpu']
+    values = [thread_candidates(), num_batch, use_mmap, num_gpu]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def workload_score(prefill_tps, decode_tps, prompt_tokens=400, output_tokens=128):
+    """Requests/sec for a typical RAG request; balances prefill against decode."""
+    if prefill_tps <= 0 or decode_tps <= 0:
+        return 0.0
+    return 1.0 / (prompt_tokens / prefill_tps + output_tokens / decode_tps)
+
+
+def measure(client, model_name, options, num_predict):
+    """Run one trial and return (prefill tokens/sec, decode tokens/sec)."""
+    # A unique prefix defeats the server's prompt cache so prefill is real work
+    prompt = f"[{uuid.uuid4().hex[:8]}] {TUNE_PROMPT}"
+    data = client.generate(model_name, prompt, options={**options, 'num_predict': num_predict, 'temperature': 0})
+    prompt_seconds = data.get('prompt_eval_duration', 0) / 1e9
+    eval_seconds = data.get('eval_duration', 0) / 1e9
+    prefill_tps = data.get('prompt_eval_count', 0) / prompt_seconds if prompt_seconds > 0 else 0.0
+    decode_tps = data.get('eval_count', 0) / eval_seconds if eval_seconds > 0 else 0.0
+    return prefill_tps, decode_tps
+
+
+def successive_halving(client, model_name, configs, min_predict=16, eta=2, rounds=None):
+    """Trial all configs cheaply, keep the best 1/eta, and repeat with more tokens."""
+    rounds = rounds or max(1, math.ceil(math.log(len(configs), eta)))
+    survivors = [{'options': config} for config in configs]
+    num_predict = min_predict
+    for round_number in range(rounds):
+        print(f"  Round {round_number + 1}/{rounds}: {len(survivors)} configs, {num_predict} tokens each")
+        for trial in survivors:
+            try:
+                # The first call after an option change reloads the model; discard it
+                measure(client, model_name, trial['options'], 1)
+                prefill_tps, decode_tps = measure(client, model_name, trial['options'], num_predict)
+            except requests.exceptions.RequestException as e:
+                print(f"    {trial['options']} failed: {e}")
+                prefill_tps, decode_tps = 0.0, 0.0
+            trial.update(prefill_tps=prefill_tps, decode_tps=decode_tps,
+                         score=workload_score(prefill_tps, decode_tps))
+        survivors.sort(key=lambda trial: trial['score'], reverse=True)
+        if len(survivors) == 1 or round_number == rounds - 1:
+            break
+        survivors = survivors[:max(1, len(survivors) // eta)]
+        num_predict *= eta
+    return survivors[0]
+
+
+def save_profile(path, model_name, best):
+    profile = load_profile(path)
+    profile.update(device=socket.gethostname(), cpu_model=cpu_model(), core_clusters=core_clusters())
+    profile['models'][model_name] = {
+        'options': best['options'],
+        'prefill_tokens_per_sec': round(best['prefill_tps'], 2),
+        'decode_tokens_per_sec': round(best['decode_tps'], 2),
+        'tuned_at': datetime.now().isoformat(timespec='seconds')
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(profile, file, indent=4)
+
+
+def parse_list(cast):
+    return lambda value: [cast(item) for item in value.split(',')]
+
+
+def parse_bool(value):
+    return value.strip().lower() in ('1', 'true', 'yes')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Autotune Ollama runtime options for this board.")
+    parser.add_argument('--models', nargs='*', default=None, help="Models to tune (default: all installed)")
+    parser.add_argument('--num-batch', type=parse_list(int), default=[64, 256, 512])
+    parser.add_argument('--use-mmap', type=parse_list(parse_bool), default=[True, False])
+    parser.add_argument('--num-gpu', type=parse_list(int), default=[0],
+                        help="Layers to offload; keep 0 on CPU-only boards")
+    parser.add_argument('--strategy', choices=['halving', 'grid'], default='halving')
+    parser.add_argument('--profile', default=None, help="Profile path (default: profiles/<hostname>.json)")
+    args = parser.parse_args()
+
+    # Tuning must not be skewed by an existing profile
+    client = OllamaClient(use_profile=False)
+    models = args.models or get_installed_models()
+    if not models:
+        print("No models found or couldn't connect to Ollama")
+        return
+
+    path = args.profile or profile_path()
+    configs = search_space(args.num_batch, args.use_mmap, args.num_gpu)
+    print(f"Core clusters {core_clusters()}; {len(configs)} configurations per model")
+
+    for model in models:
+        print(f"\nTuning {model}...")
+        rounds = 1 if args.strategy == 'grid' else None
+        best = successive_halving(client, model, configs, min_predict=64 if rounds else 16, rounds=rounds)
+        if best['score'] <= 0:
+            print(f"✗ {model}: no configuration succeeded")
+            continue
+        save_profile(path, model, best)
+        print(f"✓ {model}: {best['options']}")
+        print(f"  Prefill {best['prefill_tps']:.2f} tokens/sec, decode {best['decode_tps']:.2f} tokens/sec")
+
+    print(f"\nProfile saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
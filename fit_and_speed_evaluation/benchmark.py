@@ -1,40 +1,57 @@
 import requests
+import argparse
 import csv
 import json
+import os
+import sys
 from datetime import datetime
 import time
 import statistics
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ollama_client import get_client
+from prefix_cache import OllamaPrefixSession
+import tracing
+from tracing import span
+
+# Shared instruction prefix used by --prefix-reuse runs
+BENCHMARK_PREFIX = (
+    "You are a helpful assistant running on a small single-board computer. "
+    "Answer the request below briefly and directly.\n\n"
+)
+
+DEFAULT_PROMPT = "Tell me about the world in 5 words"
+
+CSV_HEADER = [
+    'Model',
+    'Run Number',
+    'Response',
+    'Tokens/Second',
+    'Total Tokens',
+    'Average Tokens/Second',
+    'Average Total Tokens'
+]
+
 def get_installed_models():
     """Fetch all installed Ollama models."""
     try:
-        response = requests.get('http://localhost:11434/api/tags')
-        if response.status_code == 200:
-            return [model['name'] for model in response.json()['models']]
-        return []
+        return get_client().list_models()
     except requests.exceptions.RequestException as e:
         print(f"Error fetching models: {e}")
         return []
 
-def query_model(model_name, prompt):
+def query_model(model_name, prompt, session=None):
     """Query a specific model and return response with metrics."""
     try:
         start_time = time.time()
         
-        response = requests.post(
-            'http://localhost:11434/api/generate',
-            json={
-                'model': model_name,
-                'prompt': prompt,
-                'stream': False
-            }
-        )
-        
-        if response.status_code != 200:
-            return None, None, None
+        if session is not None:
+            # Only the prompt is sent; the prefilled prefix is reused
+            response_data = session.generate(prompt)
+        else:
+            response_data = get_client().generate(model_name, prompt)
         
         end_time = time.time()
-        response_data = response.json()
         
         # Calculate tokens per second
         total_tokens = response_data.get('eval_count', 0)
@@ -50,7 +67,7 @@ def query_model(model_name, prompt):
         print(f"Error querying model {model_name}: {e}")
         return None, None, None
 
-def run_model_benchmark(model_name, prompt, num_runs=4):
+def run_model_benchmark(model_name, prompt, num_runs=4, session=None):
     """Run multiple benchmarks for a single model."""
     results = []
     tokens_per_sec_list = []
@@ -58,7 +75,9 @@ def run_model_benchmark(model_name, prompt, num_runs=4):
     
     for run in range(num_runs):
         print(f"  Run {run + 1}/{num_runs}...")
-        response, tokens_per_sec, total_tokens = query_model(model_name, prompt)
+        with span('benchmark run', model=model_name, run=run + 1) as run_span:
+            response, tokens_per_sec, total_tokens = query_model(model_name, prompt, session)
+            run_span.set(tokens_per_sec=tokens_per_sec, total_tokens=total_tokens)
         
         if response is not None:
             results.append({
@@ -76,11 +95,39 @@ def run_model_benchmark(model_name, prompt, num_runs=4):
         return results, avg_tokens_per_sec, avg_total_tokens
     return None, None, None
 
+def benchmark_rows(model_name, results, avg_tokens_per_sec, avg_total_tokens):
+    """Format one model's benchmark results as CSV rows."""
+    if not results:
+        return [[model_name, "ERROR", "N/A", "N/A", "N/A", "N/A", "N/A"]]
+    return [
+        [
+            model_name,
+            run_result['run_number'],
+            run_result['response'],
+            f"{run_result['tokens_per_sec']:.2f}",
+            run_result['total_tokens'],
+            f"{avg_tokens_per_sec:.2f}",
+            f"{avg_total_tokens:.1f}"
+        ]
+        for run_result in results
+    ]
+
 def main():
+    parser = argparse.ArgumentParser(description="Benchmark all installed Ollama models.")
+    parser.add_argument('--prefix-reuse', action='store_true',
+                        help="Prefix the prompt with a shared instruction that is prefilled once per model")
+    parser.add_argument('--trace', default=None, help="Write a Chrome trace JSON to this path")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracing.enable(args.trace)
+
     # Create timestamp for the CSV filename
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    csv_filename = f'ollama_benchmark_{timestamp}.csv'
-    prompt = "Tell me about the world in 5 words"
+    # Prefix runs send BENCHMARK_PREFIX in raw mode, a different workload from the plain prompt
+    workload = 'prefix_' if args.prefix_reuse else ''
+    csv_filename = f'ollama_benchmark_{workload}{timestamp}.csv'
+    prompt = DEFAULT_PROMPT
     
     # Get all installed models
     models = get_installed_models()
@@ -91,37 +138,34 @@ def main():
     # Prepare CSV file
     with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
         writer = csv.writer(csvfile)
-        writer.writerow([
-            'Model',
-            'Run Number',
-            'Response',
-            'Tokens/Second',
-            'Total Tokens',
-            'Average Tokens/Second',
-            'Average Total Tokens'
-        ])
+        writer.writerow(CSV_HEADER)
         
         # Query each model and log results
         for model in models:
             print(f"\nBenchmarking {model}...")
-            results, avg_tokens_per_sec, avg_total_tokens = run_model_benchmark(model, prompt)
+            tuned_options = get_client().tuned_options(model)
+            if tuned_options:
+                print(f"  Using autotuned options: {tuned_options}")
+            session = None
+            if args.prefix_reuse:
+                session = OllamaPrefixSession(model, BENCHMARK_PREFIX)
+                try:
+                    session.warm()
+                except requests.exceptions.RequestException as e:
+                    print(f"Error prefilling prefix for {model}: {e}")
+                    session = None
+            results, avg_tokens_per_sec, avg_total_tokens = run_model_benchmark(model, prompt, session=session)
             
+            # Write individual run results
+            writer.writerows(benchmark_rows(model, results, avg_tokens_per_sec, avg_total_tokens))
             if results:
-                # Write individual run results
-                for run_result in results:
-                    writer.writerow([
-                        model,
-                        run_result['run_number'],
-                        run_result['response'],
-                        f"{run_result['tokens_per_sec']:.2f}",
-                        run_result['total_tokens'],
-                        f"{avg_tokens_per_sec:.2f}",
-                        f"{avg_total_tokens:.1f}"
-                    ])
                 print(f"✓ {model} completed successfully")
                 print(f"  Average tokens/sec: {avg_tokens_per_sec:.2f}")
+                if session:
+                    reuse = session.stats.summary()
+                    print(f"  Prefill tokens saved: {reuse['prefill_tokens_saved']} "
+                          f"(~{reuse['seconds_saved']:.2f}s)")
             else:
-                writer.writerow([model, "ERROR", "N/A", "N/A", "N/A", "N/A", "N/A"])
                 print(f"✗ {model} failed")
     
     print(f"\nBenchmark complete! Results saved to {csv_filename}")
@@ -0,0 +1,151 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import requests
+
+from benchmark import CSV_HEADER, DEFAULT_PROMPT
+
+# Fleet controller: dispatches the same benchmark job to every agent.py in
+# parallel and collects the results into one SQLite store, tagged with each
+# board's hardware facts. Each run is also written as a CSV under
+# results/<device>/ like the hand-copied benchmarks.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    job_id TEXT PRIMARY KEY,
+    agent_url TEXT,
+    device TEXT,
+    board TEXT,
+    cpu_model TEXT,
+    cpu_count INTEGER,
+    ram_mb INTEGER,
+    kernel TEXT,
+    arch TEXT,
+    ollama_version TEXT,
+    prompt TEXT,
+    started_at REAL,
+    finished_at REAL,
+    facts TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT REFERENCES runs(job_id),
+    model TEXT,
+    run_number TEXT,
+    response TEXT,
+    tokens_per_sec TEXT,
+    total_tokens TEXT,
+    avg_tokens_per_sec TEXT,
+    avg_total_tokens TEXT
+);
+"""
+
+
+def run_job(session, agent_url, spec, poll_interval=5.0, timeout=None):
+    """Start a job on one agent and wait for it to finish."""
+    agent_url = agent_url.rstrip('/')
+    response = session.post(f'{agent_url}/jobs', json=spec, timeout=10)
+    response.raise_for_status()
+    job_id = response.json()['id']
+
+    deadline = time.time() + timeout if timeout else None
+    while True:
+        response = session.get(f'{agent_url}/jobs/{job_id}', timeout=10)
+        response.raise_for_status()
+        job = response.json()
+        if job['status'] in ('done', 'failed'):
+            return job
+        if deadline and time.time() > deadline:
+            raise TimeoutError(f"job {job_id} on {agent_url} did not finish in {timeout}s")
+        time.sleep(poll_interval)
+
+
+def open_store(path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def store_job(connection, agent_url, job):
+    facts = job['facts']
+    connection.execute(
+        "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            job['id'], agent_url, facts['device'], facts.get('board'), facts.get('cpu_model'),
+            facts.get('cpu_count'), facts.get('ram_mb'), facts.get('kernel'), facts.get('arch'),
+            facts.get('ollama_version'), job['spec'].get('prompt') or DEFAULT_PROMPT,
+            job.get('started_at'), job.get('finished_at'), json.dumps(facts)
+        )
+    )
+    connection.executemany(
+        "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(job['id'], *[str(value) for value in row]) for row in job['rows']]
+    )
+    connection.commit()
+
+
+def write_csv(results_dir, job):
+    """Write a job's rows to results/<device>/ollama_benchmark_<timestamp>.csv."""
+    device = re.sub(r'[^A-Za-z0-9_.-]', '_', job['facts']['device'])
+    timestamp = datetime.fromtimestamp(job['finished_at']).strftime('%Y%m%d_%H%M%S')
+    device_dir = os.path.join(results_dir, device)
+    os.makedirs(device_dir, exist_ok=True)
+    csv_filename = os.path.join(device_dir, f'ollama_benchmark_{timestamp}.csv')
+    with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(job['rows'])
+    return csv_filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark on a fleet of agents.")
+    parser.add_argument('agents', nargs='+', help="Agent URLs, e.g. http://orangepi.local:8765")
+    parser.add_argument('--models', nargs='*', default=None, help="Models to benchmark (default: all installed)")
+    parser.add_argument('--prompt', default=DEFAULT_PROMPT)
+    parser.add_argument('--num-runs', type=int, default=4)
+    parser.add_argument('--results-dir', default='results')
+    parser.add_argument('--store', default=os.path.join('results', 'fleet.sqlite3'))
+    parser.add_argument('--poll-interval', type=float, default=5.0)
+    parser.add_argument('--timeout', type=float, default=None, help="Give up on an agent after N seconds")
+    args = parser.parse_args()
+
+    spec = {'models': args.models, 'prompt': args.prompt, 'num_runs': args.num_runs}
+    connection = open_store(args.store)
+    session = requests.Session()
+
+    with ThreadPoolExecutor(max_workers=len(args.agents)) as executor:
+        futures = {
+            executor.submit(run_job, session, agent, spec, args.poll_interval, args.timeout): agent
+            for agent in args.agents
+        }
+        # Jobs run in parallel; results are stored from this thread only
+        for future in as_completed(futures):
+            agent = futures[future]
+            try:
+                job = future.result()
+            except (requests.exceptions.RequestException, TimeoutError) as e:
+                print(f"✗ {agent}: {e}")
+                continue
+            if job['status'] != 'done':
+                print(f"✗ {agent}: {job.get('error', 'job failed')}")
+                continue
+            store_job(connection, agent, job)
+            csv_filename = write_csv(args.results_dir, job)
+            facts = job['facts']
+            print(f"✓ {facts['device']} ({facts.get('cpu_model')}, {facts.get('ram_mb')} MB, "
+                  f"Ollama {facts.get('ollama_version')}): {len(job['rows'])} rows -> {csv_filename}")
+
+    connection.close()
+    print(f"\nFleet results stored in {args.store}")
+
+
+if __name__ == "__main__":
+    main()
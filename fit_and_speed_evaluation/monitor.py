@@ -0,0 +1,261 @@
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ollama_client import get_client
+
+# Continuous performance monitor. Periodically sends a short canary request
+# to each configured model and exposes the results as Prometheus metrics on
+# http://<host>:<port>/metrics, so regressions (new Ollama version, thermal
+# throttling, SD-card wear) show up without rerunning benchmark.py.
+
+CANARY_PROMPT = "Tell me about the world in 5 words"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in sorted(labels.items())) + '}'
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f'{self.name}{_format_labels(dict(key))} {value}')
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = float(value)
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f'# TYPE {self.name} gauge'
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = sorted(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.series.setdefault(key, {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            for key, series in sorted(self.series.items()):
+                labels = dict(key)
+                for bound, count in zip(self.buckets, series['counts']):
+                    lines.append(f'{self.name}_bucket{_format_labels({**labels, "le": bound})} {count}')
+                lines.append(f'{self.name}_bucket{_format_labels({**labels, "le": "+Inf"})} {series["count"]}')
+                lines.append(f'{self.name}_sum{_format_labels(labels)} {series["sum"]}')
+                lines.append(f'{self.name}_count{_format_labels(labels)} {series["count"]}')
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        self.tokens_per_second = Histogram(
+            'lemonade_canary_tokens_per_second', 'Decode throughput of canary requests',
+            [0.5, 1, 2, 3, 5, 8, 13, 20, 35, 50, 100])
+        self.ttft = Histogram(
+            'lemonade_canary_ttft_seconds', 'Time to first token of canary requests',
+            [0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60])
+        self.load = Histogram(
+            'lemonade_canary_load_seconds', 'Model load time reported by Ollama',
+            [0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120])
+        self.duration = Histogram(
+            'lemonade_canary_duration_seconds', 'Wall time of canary requests',
+            [0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300])
+        self.memory = Gauge('lemonade_model_memory_bytes', 'Memory used by the loaded model (/api/ps)')
+        self.requests = Counter('lemonade_canary_requests_total', 'Canary requests sent')
+        self.failures = Counter('lemonade_canary_failures_total', 'Canary requests that failed')
+        self.last_success = Gauge('lemonade_canary_last_success_timestamp_seconds',
+                                  'Unix time of the last successful canary')
+
+    def render(self):
+        lines = []
+        for metric in (self.tokens_per_second, self.ttft, self.load, self.duration,
+                       self.memory, self.requests, self.failures, self.last_success):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def with_tag(model_name):
+    """Add Ollama's implicit ':latest' tag, so 'tinyllama' matches /api/ps names."""
+    return model_name if ':' in model_name else f'{model_name}:latest'
+
+
+class OllamaBackend:
+    def generate_stream(self, model_name, prompt):
+        return get_client().generate_stream(model_name, prompt, options={'num_predict': 32})
+
+    def memory_bytes(self, model_name):
+        wanted = with_tag(model_name)
+        for model in get_client().running():
+            if wanted in (with_tag(model.get('name', '')), with_tag(model.get('model', ''))):
+                return model.get('size', 0)
+        return None
+
+
+class MockBackend:
+    """Synthetic Ollama stand-in for exercising the monitor without a model."""
+
+    def __init__(self, tokens_per_second=20.0, ttft=0.2, failure_rate=0.0, seed=None):
+        self.tokens_per_second = tokens_per_second
+        self.ttft = ttft
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+
+    def generate_stream(self, model_name, prompt):
+        if self.random.random() < self.failure_rate:
+            raise requests.exceptions.ConnectionError(f"mock failure for {model_name}")
+        time.sleep(self.ttft)
+        num_tokens = 8
+        for _ in range(num_tokens):
+            time.sleep(1 / self.tokens_per_second)
+            yield {'response': ' word', 'done': False}
+        yield {
+            'response': '',
+            'done': True,
+            'eval_count': num_tokens,
+            'eval_duration': int(num_tokens / self.tokens_per_second * 1e9),
+            'load_duration': int(0.01 * 1e9)
+        }
+
+    def memory_bytes(self, model_name):
+        return 512 * 2**20
+
+
+def run_canary(backend, metrics, model_name, prompt=CANARY_PROMPT):
+    """Send one canary request and record its metrics; returns True on success."""
+    metrics.requests.inc(model=model_name)
+    start_time = time.perf_counter()
+    first_token_time = None
+    final_chunk = {}
+    try:
+        for chunk in backend.generate_stream(model_name, prompt):
+            if 'error' in chunk:
+                # Ollama reports mid-stream failures in-band with HTTP 200
+                raise RuntimeError(chunk['error'])
+            if chunk.get('response') and first_token_time is None:
+                first_token_time = time.perf_counter()
+            if chunk.get('done'):
+                final_chunk = chunk
+        memory = backend.memory_bytes(model_name)
+    except (requests.exceptions.RequestException, ValueError, RuntimeError) as e:
+        metrics.failures.inc(model=model_name)
+        print(f"✗ {model_name}: {e}")
+        return False
+
+    metrics.duration.observe(time.perf_counter() - start_time, model=model_name)
+    if first_token_time is not None:
+        metrics.ttft.observe(first_token_time - start_time, model=model_name)
+    eval_seconds = final_chunk.get('eval_duration', 0) / 1e9
+    if eval_seconds > 0:
+        metrics.tokens_per_second.observe(final_chunk.get('eval_count', 0) / eval_seconds, model=model_name)
+    metrics.load.observe(final_chunk.get('load_duration', 0) / 1e9, model=model_name)
+    if memory is not None:
+        metrics.memory.set(memory, model=model_name)
+    metrics.last_success.set(time.time(), model=model_name)
+    return True
+
+
+def monitor_loop(backend, metrics, models, interval, stop_event):
+    while not stop_event.is_set():
+        for model in models:
+            if stop_event.is_set():
+                break
+            try:
+                run_canary(backend, metrics, model)
+            except Exception as e:
+                # Keep the loop alive so /metrics never goes stale silently
+                metrics.failures.inc(model=model)
+                print(f"✗ {model}: unexpected error: {e}")
+        stop_event.wait(interval)
+
+
+def make_handler(metrics):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitor Ollama performance and export Prometheus metrics.")
+    parser.add_argument('models', nargs='+')
+    parser.add_argument('--interval', type=float, default=300.0, help="Seconds between canary rounds")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=9101)
+    parser.add_argument('--mock', action='store_true', help="Use a synthetic backend instead of Ollama")
+    args = parser.parse_args()
+
+    backend = MockBackend() if args.mock else OllamaBackend()
+    metrics = Metrics()
+    stop_event = threading.Event()
+    worker = threading.Thread(target=monitor_loop, args=(backend, metrics, args.models, args.interval, stop_event),
+                              daemon=True)
+    worker.start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(metrics))
+    print(f"Serving metrics on http://{args.host}:{args.port}/metrics (canary every {args.interval:.0f}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping monitor...")
+    finally:
+        stop_event.set()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
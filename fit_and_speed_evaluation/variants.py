@@ -0,0 +1,239 @@
+import argparse
+import csv
+import os
+import socket
+import statistics
+import sys
+import threading
+from datetime import datetime
+
+import requests
+
+from benchmark import DEFAULT_PROMPT, get_installed_models
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ollama_client import get_client
+
+# Quantization / size variant comparison. Models are grouped by family using
+# /api/show metadata so e.g. phi3.5 q4_0 vs q8_0 or smollm2 135m/360m/1.7b
+# show speed, memory and a quick quality score side by side.
+
+# Short factual checks: (prompt, accepted answers). Enough to catch a
+# quantization that breaks the model, not a substitute for PIQA.
+QUALITY_CHECKS = [
+    ("What is the capital of France? Answer with one word.", ["paris"]),
+    ("What is 7 + 5? Answer with a number.", ["12", "twelve"]),
+    ("What color is the sky on a clear day? Answer with one word.", ["blue"]),
+    ("How many legs does a spider have? Answer with a number.", ["8", "eight"]),
+    ("What is the opposite of hot? Answer with one word.", ["cold"]),
+    ("Which planet is known as the Red Planet? Answer with one word.", ["mars"]),
+    ("What is frozen water called? Answer with one word.", ["ice"]),
+    ("How many days are in a week? Answer with a number.", ["7", "seven"]),
+]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+CSV_HEADER = [
+    'Family',
+    'Model',
+    'Parameter Size',
+    'Quantization',
+    # Decode-only, from eval_duration; benchmark.py's Tokens/Second is wall-clock
+    'Decode Tokens/Second',
+    'Prefill Tokens/Second',
+    'Load Seconds',
+    'Peak Memory MB',
+    'Quality Score'
+]
+
+
+class OllamaMemorySampler:
+    """Samples the resident memory of local Ollama processes in the background.
+
+    `peak_mb` is measured above the baseline taken on entry, so `ollama serve`
+    itself is not counted.
+    """
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.baseline_mb = 0.0
+        self.peak_mb = 0.0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _rss_mb(self):
+        total_kb = 0
+        for pid in os.listdir('/proc'):
+            if not pid.isdigit():
+                continue
+            try:
+                with open(f'/proc/{pid}/status', 'r') as file:
+                    status = file.read()
+            except OSError:
+                continue
+            name = status.split('\n', 1)[0].split(':', 1)[-1].strip()
+            if not name.startswith('ollama'):
+                continue
+            for line in status.splitlines():
+                if line.startswith('VmRSS:'):
+                    total_kb += int(line.split()[1])
+        return total_kb / 1024
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.peak_mb = max(self.peak_mb, self._rss_mb() - self.baseline_mb)
+            self.stop_event.wait(self.interval)
+
+    def __enter__(self):
+        if os.path.isdir('/proc'):
+            self.baseline_mb = self._rss_mb()
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+
+def variant_info(model_name):
+    """Return family, parameter size and quantization from /api/show."""
+    details = get_client().show(model_name).get('details', {})
+    base_name = model_name.split(':')[0]
+    return {
+        'family': f"{base_name} ({details.get('family', 'unknown')})",
+        'parameter_size': details.get('parameter_size', ''),
+        'quantization': details.get('quantization_level', '')
+    }
+
+
+def quality_score(model_name):
+    """Fraction of QUALITY_CHECKS the model answers correctly."""
+    correct = 0
+    for prompt, answers in QUALITY_CHECKS:
+        response_data = get_client().generate(model_name, prompt, options={'temperature': 0, 'num_predict': 16})
+        text = response_data.get('response', '').lower()
+        if any(answer in text for answer in answers):
+            correct += 1
+    return correct / len(QUALITY_CHECKS)
+
+
+def unload_all(client):
+    """Unload every model Ollama still holds in memory (keep_alive)."""
+    for model in client.running():
+        client.generate(model['name'], '', keep_alive=0)
+
+
+def measure_variant(model_name, prompt, num_runs=3):
+    """Measure decode/prefill speed, load time, peak memory and quality of one model."""
+    client = get_client()
+    # Runners left over from earlier requests would be counted as this model's memory
+    unload_all(client)
+    decode_rates, prefill_rates, load_seconds = [], [], []
+    with OllamaMemorySampler() as sampler:
+        for _ in range(num_runs):
+            response_data = client.generate(model_name, prompt)
+            eval_seconds = response_data.get('eval_duration', 0) / 1e9
+            prompt_seconds = response_data.get('prompt_eval_duration', 0) / 1e9
+            if eval_seconds > 0:
+                decode_rates.append(response_data.get('eval_count', 0) / eval_seconds)
+            if prompt_seconds > 0:
+                prefill_rates.append(response_data.get('prompt_eval_count', 0) / prompt_seconds)
+            load_seconds.append(response_data.get('load_duration', 0) / 1e9)
+        quality = quality_score(model_name)
+        loaded_mb = max((m.get('size', 0) / 2**20 for m in client.running() if m.get('name') == model_name),
+                        default=0.0)
+
+    client.generate(model_name, '', keep_alive=0)
+
+    return {
+        'tokens_per_sec': statistics.mean(decode_rates) if decode_rates else 0.0,
+        'prefill_tokens_per_sec': statistics.mean(prefill_rates) if prefill_rates else 0.0,
+        'load_seconds': max(load_seconds) if load_seconds else 0.0,
+        # Local RSS is the real peak; /api/ps size is the fallback for remote servers
+        'peak_memory_mb': sampler.peak_mb or loaded_mb,
+        'quality': quality
+    }
+
+
+def print_report(rows, ram_budget_mb=None):
+    """Print variants grouped by family, marking the fastest one within budget."""
+    families = {}
+    for row in rows:
+        families.setdefault(row['family'], []).append(row)
+
+    for family, variants in sorted(families.items()):
+        print(f"\n{family}")
+        print(f"  {'Model':<28}{'Params':>8}{'Quant':>10}{'tok/s':>9}{'prefill':>9}{'MB':>9}{'quality':>9}")
+        fitting = [v for v in variants if ram_budget_mb is None or v['peak_memory_mb'] <= ram_budget_mb]
+        best = max(fitting, key=lambda v: v['tokens_per_sec'], default=None)
+        for v in sorted(variants, key=lambda v: v['tokens_per_sec'], reverse=True):
+            marker = ' *' if v is best else ''
+            print(f"  {v['model']:<28}{v['parameter_size']:>8}{v['quantization']:>10}"
+                  f"{v['tokens_per_sec']:>9.2f}{v['prefill_tokens_per_sec']:>9.2f}"
+                  f"{v['peak_memory_mb']:>9.0f}{v['quality']:>9.2f}{marker}")
+        if ram_budget_mb is not None and best is None:
+            print(f"  No variant fits in {ram_budget_mb:.0f} MB")
+
+    fitting = [r for r in rows if ram_budget_mb is None or r['peak_memory_mb'] <= ram_budget_mb]
+    if fitting:
+        best = max(fitting, key=lambda r: r['tokens_per_sec'])
+        budget = f" within {ram_budget_mb:.0f} MB" if ram_budget_mb is not None else ""
+        print(f"\nFastest variant{budget}: {best['model']} ({best['tokens_per_sec']:.2f} tokens/sec, "
+              f"quality {best['quality']:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare quantizations and sizes of installed model families.")
+    parser.add_argument('--models', nargs='*', default=None, help="Models to compare (default: all installed)")
+    parser.add_argument('--ram-budget-gb', type=float, default=None,
+                        help="Highlight the fastest variant whose peak memory fits this budget")
+    parser.add_argument('--num-runs', type=int, default=3)
+    parser.add_argument('--prompt', default=DEFAULT_PROMPT)
+    parser.add_argument('--device-name', default=socket.gethostname(),
+                        help="Results sub-directory, e.g. orange-pi5-pro-16gb")
+    parser.add_argument('--results-dir', default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    models = args.models or get_installed_models()
+    if not models:
+        print("No models found or couldn't connect to Ollama")
+        return
+
+    rows = []
+    for model in models:
+        print(f"Measuring {model}...")
+        try:
+            row = {'model': model, **variant_info(model), **measure_variant(model, args.prompt, args.num_runs)}
+        except requests.exceptions.RequestException as e:
+            print(f"✗ {model} failed: {e}")
+            continue
+        rows.append(row)
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    device_dir = os.path.join(args.results_dir, args.device_name)
+    os.makedirs(device_dir, exist_ok=True)
+    csv_filename = os.path.join(device_dir, f'ollama_variants_{timestamp}.csv')
+    with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_HEADER)
+        for row in rows:
+            writer.writerow([
+                row['family'],
+                row['model'],
+                row['parameter_size'],
+                row['quantization'],
+                f"{row['tokens_per_sec']:.2f}",
+                f"{row['prefill_tokens_per_sec']:.2f}",
+                f"{row['load_seconds']:.2f}",
+                f"{row['peak_memory_mb']:.0f}",
+                f"{row['quality']:.2f}"
+            ])
+
+    ram_budget_mb = args.ram_budget_gb * 1024 if args.ram_budget_gb is not None else None
+    print_report(rows, ram_budget_mb)
+    print(f"\nResults saved to {csv_filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import json
+import os
+import socket
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from tracing import span, tracer
+
+# One pooled HTTP client for all Ollama traffic: keep-alive connections,
+# bounded timeouts so a hung request can't stall an overnight run, and
+# exponential backoff on connection errors and 5xx responses. Read timeouts
+# are not retried; pass a longer `timeout` for slow models instead.
+
+OLLAMA_URL = os.environ.get('OLLAMA_URL', 'http://localhost:11434')
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 360.0
+RETRY_STATUS = (500, 502, 503, 504)
+# Capacity settings stay with the caller: a context tuned on a short prompt
+# would silently truncate longer ones
+UNTUNED_OPTIONS = ('num_ctx',)
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fit_and_speed_evaluation', 'profiles')
+
+
+def profile_path(device_name=None):
+    """Path of the autotune profile for this board (see autotune.py)."""
+    return os.environ.get('OLLAMA_PROFILE') or os.path.join(PROFILE_DIR, f'{device_name or socket.gethostname()}.json')
+
+
+def load_profile(path=None):
+    """Return the saved autotune profile, or an empty one."""
+    path = path or profile_path()
+    if not os.path.exists(path):
+        return {'models': {}}
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def iter_ndjson(response):
+    """Yield decoded objects from a streamed NDJSON response.
+
+    Reads whole HTTP chunks as they arrive (one per token for Ollama) and
+    decodes lines straight from bytes, instead of iter_lines' small fixed
+    reads and per-line str conversion.
+    """
+    pending = b''
+    for chunk in response.iter_content(chunk_size=None):
+        if pending:
+            chunk = pending + chunk
+        lines = chunk.split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if pending.strip():
+        yield json.loads(pending)
+
+
+class OllamaClient:
+    """Pooled, retrying client for the Ollama HTTP API."""
+
+    def __init__(self, base_url=OLLAMA_URL, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 retries=3, backoff_factor=0.5, pool_maxsize=8, use_profile=True):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.use_profile = use_profile
+        self._profile = None
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            # A read timeout means the server is still generating; resending
+            # would rerun the whole generation and multiply the wait
+            read=0,
+            status=retries,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=None,  # generation requests are POSTs and safe to resend
+            backoff_factor=backoff_factor,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def url(self, path):
+        return path if path.startswith('http') else f'{self.base_url}{path}'
+
+    def get_json(self, path, timeout=None):
+        with span('http GET', path=path):
+            response = self.session.get(self.url(path), timeout=timeout or self.timeout)
+            response.raise_for_status()
+            return response.json()
+
+    def post_json(self, path, payload, timeout=None):
+        """POST a JSON payload to an API path (or absolute URL) and decode the reply."""
+        with span('http POST', path=path, model=payload.get('model')):
+            response = self.session.post(self.url(path), json=payload, timeout=timeout or self.timeout)
+            response.raise_for_status()
+            return response.json()
+
+    def post_stream(self, path, payload, timeout=None):
+        """POST a JSON payload and yield the NDJSON objects streamed back."""
+        with span('http POST stream', path=path, model=payload.get('model')) as request_span:
+            with self.session.post(self.url(path), json=payload, stream=True,
+                                   timeout=timeout or self.timeout) as response:
+                response.raise_for_status()
+                tokens = 0
+                for chunk in iter_ndjson(response):
+                    if tracer.enabled:
+                        tokens += 1
+                        tracer.instant('token', index=tokens)
+                    yield chunk
+                request_span.set(chunks=tokens)
+
+    def list_models(self):
+        """Return the names of all installed models."""
+        return [model['name'] for model in self.get_json('/api/tags')['models']]
+
+    def show(self, model_name):
+        return self.post_json('/api/show', {'model': model_name})
+
+    def running(self):
+        """Return the models currently loaded in memory (/api/ps)."""
+        return self.get_json('/api/ps').get('models', [])
+
+    def version(self):
+        return self.get_json('/api/version').get('version')
+
+    def tuned_options(self, model_name):
+        """Runtime options autotune.py saved for this model on this board."""
+        if not self.use_profile:
+            return {}
+        if self._profile is None:
+            self._profile = load_profile()
+        options = self._profile['models'].get(model_name, {}).get('options', {})
+        return {key: value for key, value in options.items() if key not in UNTUNED_OPTIONS}
+
+    def _options(self, model_name, options):
+        # Explicit options win over the tuned profile
+        return {**self.tuned_options(model_name), **(options or {})}
+
+    def generate(self, model_name, prompt, options=None, timeout=None, **fields):
+        """Run a non-streaming generation and return the full response dict."""
+        payload = {'model': model_name, 'prompt': prompt, 'stream': False, **fields}
+        options = self._options(model_name, options)
+        if options:
+            payload['options'] = options
+        return self.post_json('/api/generate', payload, timeout)
+
+    def generate_stream(self, model_name, prompt, options=None, timeout=None, **fields):
+        """Yield every chunk of a streamed generation."""
+        payload = {'model': model_name, 'prompt': prompt, 'stream': True, **fields}
+        options = self._options(model_name, options)
+        if options:
+            payload['options'] = options
+        return self.post_stream('/api/generate', payload, timeout)
+
+
+_client = None
+
+
+def get_client():
+    """Return the process-wide shared client."""
+    global _client
+    if _client is None:
+        _client = OllamaClient()
+    return _client
+
+
+def set_client(client):
+    """Replace the shared client, e.g. to point a process at another Ollama server."""
+    global _client
+    _client = client
@@ -0,0 +1,142 @@
+import threading
+
+from ollama_client import get_client
+
+# Prompt-prefix KV reuse for batch workloads. Requests that share a long
+# fixed prefix only prefill that prefix once; later requests send the suffix
+# and let the server reuse the cached prefix state.
+
+LLAMACPP_URL = 'http://localhost:8080'
+
+
+def order_for_prefix_reuse(prompts):
+    """Return prompt indices ordered so prompts sharing prefixes are adjacent."""
+    return sorted(range(len(prompts)), key=lambda i: prompts[i])
+
+
+class PrefixReuseStats:
+    """Thread-safe tally of prefill work avoided by prefix reuse."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.prefill_tokens = 0
+        self.saved_tokens = 0
+        self.saved_seconds = 0.0
+
+    def add(self, prefill_tokens, saved_tokens, saved_seconds):
+        with self.lock:
+            self.requests += 1
+            self.prefill_tokens += prefill_tokens
+            self.saved_tokens += saved_tokens
+            self.saved_seconds += saved_seconds
+
+    def summary(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'prefill_tokens': self.prefill_tokens,
+                'prefill_tokens_saved': self.saved_tokens,
+                'seconds_saved': self.saved_seconds
+            }
+
+
+class OllamaPrefixSession:
+    """Reuses a prefilled prefix through Ollama's `context` carry-over.
+
+    Requests run in raw mode so the carried context is exactly the prefix
+    tokens followed by the suffix, with no chat template in between.
+    """
+
+    def __init__(self, model_name, prefix, client=None, options=None, timeout=None):
+        self.model_name = model_name
+        self.prefix = prefix
+        self.client = client or get_client()
+        self.options = dict(options or {})
+        self.timeout = timeout
+        self.context = None
+        self.prefill_rate = 0.0
+        self.stats = PrefixReuseStats()
+
+    def warm(self):
+        """Prefill the prefix once and keep its context tokens."""
+        data = self.client.generate(
+            self.model_name,
+            self.prefix,
+            options={**self.options, 'num_predict': 1},
+            timeout=self.timeout,
+            raw=True
+        )
+        # The returned context ends with the generated token(s); drop them
+        context = data.get('context', [])
+        self.context = context[:len(context) - data.get('eval_count', 0)]
+        duration = data.get('prompt_eval_duration', 0) / 1e9
+        prompt_tokens = data.get('prompt_eval_count', 0)
+        self.prefill_rate = prompt_tokens / duration if duration > 0 else 0.0
+        return self.context
+
+    def generate(self, suffix, num_predict=None):
+        """Generate a completion for prefix + suffix, reusing the prefix."""
+        if self.context is None:
+            self.warm()
+        options = dict(self.options)
+        if num_predict is not None:
+            options['num_predict'] = num_predict
+        data = self.client.generate(
+            self.model_name,
+            suffix,
+            options=options,
+            timeout=self.timeout,
+            context=self.context,
+            raw=True
+        )
+
+        # The returned context is every prompt token plus the generated ones;
+        # whatever the server did not evaluate came from its cache
+        prompt_tokens = len(data.get('context', [])) - data.get('eval_count', 0)
+        evaluated = data.get('prompt_eval_count', 0)
+        saved_tokens = max(prompt_tokens - evaluated, 0)
+        duration = data.get('prompt_eval_duration', 0) / 1e9
+        rate = evaluated / duration if duration > 0 else self.prefill_rate
+        self.stats.add(evaluated, saved_tokens, saved_tokens / rate if rate else 0.0)
+        return data
+
+
+class LlamaCppPrefixSession:
+    """Reuses a prefix through llama.cpp server `cache_prompt` and slot pinning."""
+
+    def __init__(self, prefix, base_url=LLAMACPP_URL, slot=None, options=None, timeout=None, client=None):
+        self.prefix = prefix
+        self.url = base_url.rstrip('/') + '/completion'
+        self.client = client or get_client()
+        self.slot = slot
+        self.options = dict(options or {})
+        self.timeout = timeout
+        self.stats = PrefixReuseStats()
+
+    def warm(self):
+        return self.generate('', num_predict=0)
+
+    def generate(self, suffix, num_predict=None):
+        """Complete prefix + suffix and return an Ollama-shaped response dict."""
+        payload = {
+            'prompt': self.prefix + suffix,
+            'cache_prompt': True,
+            **self.options
+        }
+        if num_predict is not None:
+            payload['n_predict'] = num_predict
+        if self.slot is not None:
+            payload['id_slot'] = self.slot
+        data = self.client.post_json(self.url, payload, self.timeout)
+
+        timings = data.get('timings', {})
+        evaluated = timings.get('prompt_n', 0)
+        saved_tokens = max(data.get('tokens_evaluated', evaluated) - evaluated, 0)
+        rate = timings.get('prompt_per_second', 0.0)
+        self.stats.add(evaluated, saved_tokens, saved_tokens / rate if rate else 0.0)
+        return {
+            'response': data.get('content', ''),
+            'eval_count': timings.get('predicted_n', 0),
+            'prompt_eval_count': evaluated
+        }
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+
+# Indexed, memory-mapped access to JSONL benchmark files. The byte offset of
+# every record is computed once and cached next to the file, so item i can be
+# fetched without scanning and workers can split the file between them.
+
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'JSONLIDX'
+INDEX_HEADER = struct.Struct('<8sQQ20sQ')
+SAMPLE_BYTES = 65536
+
+
+def _sample_hash(path, size):
+    """Hash the head and tail of a file; cheap enough to check on every open.
+
+    Not a substitute for the mtime check: a same-size edit in the middle
+    leaves it unchanged.
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        digest.update(file.read(SAMPLE_BYTES))
+        if size > SAMPLE_BYTES:
+            file.seek(max(size - SAMPLE_BYTES, SAMPLE_BYTES))
+            digest.update(file.read(SAMPLE_BYTES))
+    return digest.digest()
+
+
+def build_offsets(path):
+    """Return an array of (start, end) byte offsets, one pair per non-blank line."""
+    offsets = array('Q')
+    position = 0
+    with open(path, 'rb') as file:
+        for line in file:
+            if line.strip():
+                offsets.append(position)
+                offsets.append(position + len(line))
+            position += len(line)
+    return offsets
+
+
+def load_index(path, index_path=None):
+    """Load the cached offset index, rebuilding it if the data file changed."""
+    index_path = index_path or path + INDEX_SUFFIX
+    stat = os.stat(path)
+    sample = _sample_hash(path, stat.st_size)
+
+    if os.path.exists(index_path):
+        with open(index_path, 'rb') as file:
+            header = file.read(INDEX_HEADER.size)
+            if len(header) == INDEX_HEADER.size:
+                magic, size, mtime_ns, cached_sample, count = INDEX_HEADER.unpack(header)
+                # Any write changes the mtime; the sample hash only catches
+                # edits that also preserve it
+                if (magic == INDEX_MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+                        and cached_sample == sample):
+                    offsets = array('Q')
+                    offsets.frombytes(file.read(count * 2 * offsets.itemsize))
+                    if len(offsets) == count * 2:
+                        return offsets
+
+    offsets = build_offsets(path)
+    try:
+        with open(index_path, 'wb') as file:
+            file.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, sample, len(offsets) // 2))
+            offsets.tofile(file)
+    except OSError:
+        # Read-only dataset directory: keep the index in memory only
+        pass
+    return offsets
+
+
+class JsonlDataset:
+    """Random-access view over a JSONL file.
+
+    Records are decoded only when accessed. `fields` restricts decoded
+    records to those keys, e.g. JsonlDataset(path, fields=['goal']).
+    """
+
+    def __init__(self, path, fields=None, index_path=None):
+        self.path = path
+        self.fields = list(fields) if fields else None
+        self.offsets = load_index(path, index_path)
+        self.indices = None
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def _view(self, indices=None, fields=None):
+        view = object.__new__(JsonlDataset)
+        view.path = self.path
+        view.fields = self.fields if fields is None else list(fields)
+        view.offsets = self.offsets
+        view.indices = indices if indices is not None else self.indices
+        view._file = self._file
+        view._mmap = self._mmap
+        return view
+
+    def __len__(self):
+        return len(self.indices) if self.indices is not None else len(self.offsets) // 2
+
+    def _position(self, i):
+        """Map an index in this view to a record number in the file."""
+        return self.indices[i] if self.indices is not None else range(len(self))[i]
+
+    def raw(self, i):
+        """Return the undecoded bytes of record i."""
+        position = self._position(i)
+        return self._mmap[self.offsets[2 * position]:self.offsets[2 * position + 1]]
+
+    def _decode(self, data):
+        record = json.loads(data)
+        if self.fields is None:
+            return record
+        return {field: record.get(field) for field in self.fields}
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.select(range(len(self))[key])
+        return self._decode(self.raw(key))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def items(self):
+        """Yield (record number, record) pairs, as piqa_runner.iter_items does."""
+        for i in range(len(self)):
+            yield self._position(i), self[i]
+
+    def select(self, indices):
+        """Return a view over the given positions of this dataset."""
+        return self._view(indices=[self._position(i) for i in indices])
+
+    def project(self, *fields):
+        """Return a view that only decodes the given fields."""
+        return self._view(fields=fields)
+
+    def shard(self, shard_index, num_shards):
+        """Return the contiguous block of records assigned to one worker."""
+        if not 0 <= shard_index < num_shards:
+            raise ValueError(f"shard_index must be in [0, {num_shards})")
+        total = len(self)
+        start = total * shard_index // num_shards
+        end = total * (shard_index + 1) // num_shards
+        return self[start:end]
+
+    def close(self):
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,209 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import statistics
+
+# Joins promptfoo quality results with fit_and_speed_evaluation benchmark and
+# variant CSVs and reports, per device, which models sit on the Pareto
+# frontier of pass rate vs wall-clock tokens/sec vs peak memory.
+
+SPEED_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'fit_and_speed_evaluation', 'results')
+
+OUTPUT_HEADER = [
+    'Device',
+    'Model',
+    'Pass Rate',
+    'Latency ms',
+    'Tokens/Second',
+    'Decode Tokens/Second',
+    'Peak Memory MB',
+    'Quality x Tokens/Second',
+    'Pareto'
+]
+
+
+def normalize_model(name):
+    """Map promptfoo provider ids and Ollama tags to one model key."""
+    for prefix in ('ollama:chat:', 'ollama:completion:', 'ollama:'):
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+    if name.endswith(':latest'):
+        name = name[:-len(':latest')]
+    return name
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_promptfoo(paths):
+    """Return {model: {'pass_rate', 'latency_ms', 'tests'}} from promptfoo JSON outputs."""
+    outcomes = {}
+    for path in paths:
+        with open(path, 'r') as file:
+            data = json.load(file)
+        results = data.get('results', data)
+        if isinstance(results, dict):
+            results = results.get('results', [])
+        for result in results:
+            provider = result.get('provider', {})
+            provider_id = provider.get('id') if isinstance(provider, dict) else provider
+            if not provider_id:
+                continue
+            entry = outcomes.setdefault(normalize_model(provider_id), {'passed': 0, 'total': 0, 'latencies': []})
+            entry['total'] += 1
+            entry['passed'] += 1 if result.get('success') else 0
+            if result.get('latencyMs') is not None:
+                entry['latencies'].append(result['latencyMs'])
+
+    return {
+        model: {
+            'pass_rate': entry['passed'] / entry['total'],
+            'latency_ms': statistics.mean(entry['latencies']) if entry['latencies'] else None,
+            'tests': entry['total']
+        }
+        for model, entry in outcomes.items() if entry['total']
+    }
+
+
+def load_speed(results_dir):
+    """Return {device: {model: metrics}} from benchmark and variant CSVs.
+
+    `tokens_per_sec` is benchmark.py's wall-clock rate, which includes load
+    and prefill. `decode_tokens_per_sec` is variants.py's eval_duration rate.
+    The two are kept apart because they measure different things.
+    `peak_memory_mb` comes from variants.py.
+    """
+    samples = {}
+    for path in glob.glob(os.path.join(results_dir, '*', '*.csv')):
+        filename = os.path.basename(path)
+        if filename.startswith('ollama_benchmark_prefix_'):
+            # Raw-mode prefix-reuse runs measure a different prompt
+            continue
+        device = os.path.basename(os.path.dirname(path))
+        with open(path, 'r', newline='', encoding='utf-8') as csvfile:
+            for row in csv.DictReader(csvfile):
+                if not row.get('Model'):
+                    continue
+                model = normalize_model(row['Model'])
+                entry = samples.setdefault(device, {}).setdefault(model, {'tps': [], 'decode': [], 'memory': []})
+                if filename.startswith('ollama_benchmark_'):
+                    tokens_per_sec = _float(row.get('Tokens/Second'))
+                    if tokens_per_sec is not None:
+                        entry['tps'].append(tokens_per_sec)
+                decode = _float(row.get('Decode Tokens/Second'))
+                if decode is not None:
+                    entry['decode'].append(decode)
+                memory = _float(row.get('Peak Memory MB'))
+                if memory:
+                    entry['memory'].append(memory)
+
+    return {
+        device: {
+            model: {
+                'tokens_per_sec': statistics.mean(entry['tps']),
+                'decode_tokens_per_sec': statistics.mean(entry['decode']) if entry['decode'] else None,
+                'peak_memory_mb': max(entry['memory']) if entry['memory'] else None
+            }
+            for model, entry in models.items() if entry['tps']
+        }
+        for device, models in samples.items()
+    }
+
+
+def dominates(a, b):
+    """True if `a` is at least as good as `b` everywhere and better somewhere.
+
+    Memory only counts when both rows have it.
+    """
+    better_or_equal = [a['pass_rate'] >= b['pass_rate'], a['tokens_per_sec'] >= b['tokens_per_sec']]
+    strictly_better = [a['pass_rate'] > b['pass_rate'], a['tokens_per_sec'] > b['tokens_per_sec']]
+    if a['peak_memory_mb'] is not None and b['peak_memory_mb'] is not None:
+        better_or_equal.append(a['peak_memory_mb'] <= b['peak_memory_mb'])
+        strictly_better.append(a['peak_memory_mb'] < b['peak_memory_mb'])
+    return all(better_or_equal) and any(strictly_better)
+
+
+def pareto_frontier(rows):
+    return [row for row in rows if not any(dominates(other, row) for other in rows if other is not row)]
+
+
+def build_report(quality, speed):
+    """Join quality and speed per device and flag the Pareto frontier."""
+    report = []
+    for device, models in sorted(speed.items()):
+        rows = []
+        for model, metrics in models.items():
+            if model not in quality:
+                continue
+            rows.append({'device': device, 'model': model, **quality[model], **metrics})
+        frontier = pareto_frontier(rows)
+        for row in rows:
+            row['pareto'] = any(row is best for best in frontier)
+            row['quality_per_second'] = row['pass_rate'] * row['tokens_per_sec']
+        report.extend(sorted(rows, key=lambda row: (not row['pareto'], -row['quality_per_second'])))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pareto report of promptfoo quality vs benchmark speed and memory.")
+    parser.add_argument('promptfoo', nargs='+', help="promptfoo JSON output (npx promptfoo eval -o results.json)")
+    parser.add_argument('--results-dir', default=SPEED_RESULTS_DIR,
+                        help="Directory with one sub-directory of benchmark and variant CSVs per device")
+    parser.add_argument('--output', default='pareto_report.csv')
+    args = parser.parse_args()
+
+    quality = load_promptfoo(args.promptfoo)
+    speed = load_speed(args.results_dir)
+    report = build_report(quality, speed)
+    if not report:
+        print("No models appear in both the promptfoo results and the speed benchmarks")
+        return
+
+    current_device = None
+    for row in report:
+        if row['device'] != current_device:
+            current_device = row['device']
+            print(f"\n{current_device}")
+            print(f"  {'Model':<24}{'pass':>7}{'tok/s':>9}{'decode':>8}{'MB':>8}{'q*tok/s':>9}")
+        decode = f"{row['decode_tokens_per_sec']:.2f}" if row['decode_tokens_per_sec'] is not None else 'N/A'
+        memory = f"{row['peak_memory_mb']:.0f}" if row['peak_memory_mb'] is not None else 'N/A'
+        marker = ' *' if row['pareto'] else ''
+        print(f"  {row['model']:<24}{row['pass_rate']:>7.2f}{row['tokens_per_sec']:>9.2f}{decode:>8}{memory:>8}"
+              f"{row['quality_per_second']:>9.2f}{marker}")
+
+    if all(row['peak_memory_mb'] is None for row in report):
+        print("\nNo peak memory data; run fit_and_speed_evaluation/variants.py --device-name <device> "
+              "so memory is part of the frontier")
+
+    benchmarked = {model for models in speed.values() for model in models}
+    missing = sorted(set(quality) - benchmarked)
+    if missing:
+        print(f"\nNo speed data for: {', '.join(missing)}")
+
+    with open(args.output, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(OUTPUT_HEADER)
+        for row in report:
+            writer.writerow([
+                row['device'],
+                row['model'],
+                f"{row['pass_rate']:.3f}",
+                f"{row['latency_ms']:.0f}" if row['latency_ms'] is not None else 'N/A',
+                f"{row['tokens_per_sec']:.2f}",
+                f"{row['decode_tokens_per_sec']:.2f}" if row['decode_tokens_per_sec'] is not None else 'N/A',
+                f"{row['peak_memory_mb']:.0f}" if row['peak_memory_mb'] is not None else 'N/A',
+                f"{row['quality_per_second']:.2f}",
+                'yes' if row['pareto'] else 'no'
+            ])
+    print(f"\n* = Pareto frontier. Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,10 @@
 import json
 
+from jsonl_dataset import JsonlDataset
+
 def parse_physicaliqa(file_path):
-    data_list = []
-    with open(file_path, 'r') as file:
-        for line in file:
-            data = json.loads(line.strip())
-            data_list.append(data)
-    return data_list
+    with JsonlDataset(file_path) as dataset:
+        return list(dataset)
 
 # Example usage
 file_path = 'piqa/physicaliqa.jsonl'
@@ -15,12 +13,11 @@ file_path = 'piqa/physicaliqa.jsonl'
 
 def extract_questions(file_path):
     questions = []
-    with open(file_path, 'r') as file:
-        for line in file:
-            data = json.loads(line.strip())
+    with JsonlDataset(file_path, fields=["goal"]) as dataset:
+        for data in dataset:
             question = {
                 "role": "system",
-                "content": data.get("goal", "")
+                "content": data.get("goal") or ""
             }
             questions.append(question)
     return questions
@@ -30,12 +27,8 @@ def extract_questions(file_path):
 # print(questions)
 
 def save_goals_to_json(file_path, output_path):
-    goals = []
-    with open(file_path, 'r') as file:
-        for line in file:
-            data = json.loads(line.strip())
-            goal = data.get("goal", "")
-            goals.append(goal)
+    with JsonlDataset(file_path, fields=["goal"]) as dataset:
+        goals = [data.get("goal") or "" for data in dataset]
     
     with open(output_path, 'w') as output_file:
         json.dump(goals, output_file, indent=4)
@@ -47,14 +40,8 @@ output_path = 'piqa/goals.json'
 #print(f"Goals have been saved to {output_path}")
 
 def save_first_five_goals_to_json(file_path, output_path):
-    goals = []
-    with open(file_path, 'r') as file:
-        for i, line in enumerate(file):
-            if i >= 5:
-                break
-            data = json.loads(line.strip())
-            goal = data.get("goal", "")
-            goals.append(goal)
+    with JsonlDataset(file_path, fields=["goal"]) as dataset:
+        goals = [data.get("goal") or "" for data in dataset[:5]]
     
     with open(output_path, 'w') as output_file:
         json.dump(goals, output_file, indent=4)
@@ -0,0 +1,280 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+
+from jsonl_dataset import JsonlDataset
+from piqa_sampling import stratified_sample, wilson_interval
+from piqa_scoring import MockBackend, OpenAICompatibleBackend, make_loglik_evaluator
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ollama_client import get_client
+from prefix_cache import LlamaCppPrefixSession, OllamaPrefixSession, order_for_prefix_reuse
+
+# Native PIQA runner: asks local Ollama models to pick sol1 or sol2 for each
+# goal, checkpointing every answer so an interrupted run picks up where it
+# stopped.
+
+# The instruction prefix is shared by every item, so it can be prefilled once
+PROMPT_PREFIX = """Choose the solution that best achieves the goal. Answer with the number 1 or 2 only.
+
+"""
+
+ITEM_TEMPLATE = """Goal: {goal}
+Solution 1: {sol1}
+Solution 2: {sol2}
+Answer:"""
+
+CHOICE_PATTERN = re.compile(r'[12]')
+
+
+def iter_items(file_path, shard=None):
+    """Yield (index, item) pairs from a PIQA jsonl file, optionally one shard of it."""
+    with JsonlDataset(file_path) as dataset:
+        if shard is not None:
+            dataset = dataset.shard(*shard)
+        yield from dataset.items()
+
+
+def parse_shard(value):
+    """Parse 'K/N' into (K, N)."""
+    shard_index, num_shards = (int(part) for part in value.split('/'))
+    return shard_index, num_shards
+
+
+def load_labels(labels_path):
+    """Load a PIQA labels file (one 0/1 per line), or None if absent."""
+    if not labels_path or not os.path.exists(labels_path):
+        return None
+    with open(labels_path, 'r') as file:
+        return [int(line.strip()) for line in file if line.strip()]
+
+
+def build_suffix(item):
+    return ITEM_TEMPLATE.format(goal=item['goal'], sol1=item['sol1'], sol2=item['sol2'])
+
+
+def build_prompt(item):
+    return PROMPT_PREFIX + build_suffix(item)
+
+
+def parse_choice(text):
+    """Map a free-form answer to 0 (sol1), 1 (sol2) or None."""
+    match = CHOICE_PATTERN.search(text or '')
+    return int(match.group()) - 1 if match else None
+
+
+def query_model(model_name, prompt):
+    """Generate a short, deterministic answer from Ollama."""
+    return get_client().generate(model_name, prompt, options={'temperature': 0, 'num_predict': 4})
+
+
+def evaluate_item(model_name, index, item):
+    """Ask the model about one item and return a result record."""
+    start_time = time.time()
+    try:
+        response_data = query_model(model_name, build_prompt(item))
+    except requests.exceptions.RequestException as e:
+        return {'index': index, 'id': item.get('id'), 'error': str(e)}
+    return answer_record(index, item, response_data, start_time)
+
+
+def make_prefix_evaluator(session):
+    """Build an evaluator that only sends each item's suffix to a prefix session."""
+    def evaluate(model_name, index, item):
+        start_time = time.time()
+        try:
+            response_data = session.generate(build_suffix(item), num_predict=4)
+        except requests.exceptions.RequestException as e:
+            return {'index': index, 'id': item.get('id'), 'error': str(e)}
+        return answer_record(index, item, response_data, start_time)
+    return evaluate
+
+
+def answer_record(index, item, response_data, start_time):
+    answer = response_data.get('response', '').strip()
+    return {
+        'index': index,
+        'id': item.get('id'),
+        'answer': answer,
+        'prediction': parse_choice(answer),
+        'eval_count': response_data.get('eval_count', 0),
+        'seconds': time.time() - start_time
+    }
+
+
+def checkpoint_path(output_dir, model_name):
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', model_name)
+    return os.path.join(output_dir, f'piqa_{safe_name}.jsonl')
+
+
+def load_checkpoint(path):
+    """Return finished records keyed by item index."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r') as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a truncated last line
+                continue
+            if 'error' not in record:
+                done[record['index']] = record
+    return done
+
+
+def run_model(model_name, items, output_dir, concurrency=2, evaluate=evaluate_item):
+    """Evaluate all pending items for one model, appending to its checkpoint.
+
+    Returns the finished records for the given items only; the checkpoint may
+    hold answers from earlier runs over other items.
+    """
+    path = checkpoint_path(output_dir, model_name)
+    done = load_checkpoint(path)
+    selected, resumed = set(), []
+
+    def select():
+        for index, item in items:
+            selected.add(index)
+            if index in done:
+                resumed.append(index)
+            else:
+                yield index, item
+
+    pending = select()
+    completed = 0
+    start_time = time.time()
+
+    with open(path, 'a') as checkpoint, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight = set()
+
+        def fill():
+            while len(in_flight) < concurrency * 2:
+                try:
+                    index, item = next(pending)
+                except StopIteration:
+                    return
+                in_flight.add(executor.submit(evaluate, model_name, index, item))
+
+        fill()
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                in_flight.discard(future)
+                record = future.result()
+                checkpoint.write(json.dumps(record) + '\n')
+                checkpoint.flush()
+                if 'error' not in record:
+                    done[record['index']] = record
+                completed += 1
+                if completed % 50 == 0:
+                    rate = completed / (time.time() - start_time)
+                    print(f"  {model_name}: {completed} evaluated ({rate:.2f} items/sec)")
+            fill()
+
+    if resumed:
+        print(f"  Resumed {model_name}: {len(resumed)} items came from the checkpoint")
+    return {index: done[index] for index in selected if index in done}
+
+
+def score(records, labels=None):
+    """Return accuracy stats over the records that have a label."""
+    labeled = [r for r in records.values() if labels is not None and r['index'] < len(labels)]
+    correct = sum(1 for r in labeled if r.get('prediction') == labels[r['index']])
+    unparsed = sum(1 for r in records.values() if r.get('prediction') is None)
+    return {
+        'answered': len(records),
+        'labeled': len(labeled),
+        'correct': correct,
+        'accuracy': correct / len(labeled) if labeled else None,
+        'ci': wilson_interval(correct, len(labeled)) if labeled else None,
+        'unparsed': unparsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run PIQA against local Ollama models.")
+    parser.add_argument('models', nargs='+')
+    parser.add_argument('--data', default='piqa/physicaliqa.jsonl')
+    parser.add_argument('--labels', default='piqa/physicaliqa-labels.lst',
+                        help="PIQA labels file; the bundled test split ships without one")
+    parser.add_argument('--output-dir', default='piqa/results')
+    parser.add_argument('--concurrency', type=int, default=2)
+    parser.add_argument('--limit', type=int, default=None, help="Only evaluate the first N items")
+    parser.add_argument('--sample', type=int, default=None,
+                        help="Evaluate a reproducible stratified sample of N items")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shard', type=parse_shard, default=None,
+                        help="Only evaluate shard K of N (e.g. 0/4), for splitting a run across workers")
+    parser.add_argument('--mode', choices=['generate', 'loglik'], default='generate',
+                        help="generate: parse a free-form answer; loglik: rank solutions by log-probability")
+    parser.add_argument('--backend-url', default='http://localhost:8080',
+                        help="OpenAI-compatible server with echo+logprobs for loglik mode, or 'mock'")
+    parser.add_argument('--prefix-reuse', choices=['ollama', 'llamacpp'], default=None,
+                        help="Prefill the shared instruction prefix once and reuse it (generate mode)")
+    parser.add_argument('--llamacpp-url', default='http://localhost:8080')
+    args = parser.parse_args()
+
+    if args.mode == 'loglik':
+        backend = MockBackend() if args.backend_url == 'mock' else OpenAICompatibleBackend(args.backend_url)
+        evaluate = make_loglik_evaluator(backend)
+    else:
+        evaluate = evaluate_item
+
+    labels = load_labels(args.labels)
+    if labels is None:
+        print(f"No labels at {args.labels}; recording predictions without accuracy")
+
+    sample = None
+    if args.sample is not None:
+        sample = set(stratified_sample(iter_items(args.data), args.sample, args.seed))
+        print(f"Evaluating a stratified sample of {len(sample)} items (seed {args.seed})")
+
+    for model in args.models:
+        print(f"\nEvaluating {model}...")
+        items = iter_items(args.data, args.shard)
+        if sample is not None:
+            items = ((index, item) for index, item in items if index in sample)
+        if args.limit is not None:
+            items = islice(items, args.limit)
+
+        session = None
+        if args.prefix_reuse and args.mode == 'generate':
+            if args.prefix_reuse == 'ollama':
+                session = OllamaPrefixSession(model, PROMPT_PREFIX, options={'temperature': 0})
+            else:
+                session = LlamaCppPrefixSession(PROMPT_PREFIX, args.llamacpp_url, options={'temperature': 0})
+            session.warm()
+            evaluate = make_prefix_evaluator(session)
+            items = list(items)
+            items = [items[i] for i in order_for_prefix_reuse([build_suffix(item) for _, item in items])]
+
+        # Prefix reuse sends a raw, untemplated prompt, so its answers are kept apart
+        run_name = f'{args.mode}-prefix-{args.prefix_reuse}' if session else args.mode
+        output_dir = os.path.join(args.output_dir, run_name)
+        os.makedirs(output_dir, exist_ok=True)
+        records = run_model(model, items, output_dir, args.concurrency, evaluate)
+        stats = score(records, labels)
+        if stats['accuracy'] is not None:
+            low, high = stats['ci']
+            print(f"✓ {model}: accuracy {stats['accuracy']:.3f} ({stats['correct']}/{stats['labeled']}, "
+                  f"95% CI {low:.3f}-{high:.3f})")
+        else:
+            print(f"✓ {model}: {stats['answered']} items answered")
+        print(f"  Unparsed answers: {stats['unparsed']}")
+        if session:
+            reuse = session.stats.summary()
+            print(f"  Prefill tokens saved: {reuse['prefill_tokens_saved']} "
+                  f"(~{reuse['seconds_saved']:.1f}s of prefill over {reuse['requests']} requests)")
+
+
+if __name__ == "__main__":
+    main()
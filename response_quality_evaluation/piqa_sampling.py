@@ -0,0 +1,180 @@
+import argparse
+import math
+import random
+
+# Sample-efficient PIQA evaluation: reproducible stratified subsets, Wilson
+# confidence intervals and a sequential test that stops comparing two models
+# as soon as their accuracy difference is decided.
+
+
+def goal_length(item):
+    return len(item['goal'].split())
+
+
+def stratify(items, n_bins=4, key=goal_length):
+    """Group (index, item) pairs into n_bins strata by quantiles of `key`."""
+    values = sorted(key(item) for _, item in items)
+    if not values:
+        return []
+    cuts = [values[min(len(values) - 1, (len(values) * b) // n_bins)] for b in range(1, n_bins)]
+    strata = [[] for _ in range(n_bins)]
+    for index, item in items:
+        value = key(item)
+        bin_index = sum(1 for cut in cuts if value >= cut)
+        strata[bin_index].append(index)
+    return [stratum for stratum in strata if stratum]
+
+
+def stratified_sample(items, sample_size, seed=0, n_bins=4, key=goal_length):
+    """Return sorted item indices drawn proportionally from each stratum."""
+    items = list(items)
+    if sample_size >= len(items):
+        return sorted(index for index, _ in items)
+    strata = stratify(items, n_bins, key)
+
+    # Largest-remainder allocation keeps the total exactly at sample_size
+    quotas = [sample_size * len(stratum) / len(items) for stratum in strata]
+    counts = [int(quota) for quota in quotas]
+    by_remainder = sorted(range(len(strata)), key=lambda s: quotas[s] - counts[s], reverse=True)
+    for s in by_remainder[:sample_size - sum(counts)]:
+        counts[s] += 1
+
+    rng = random.Random(seed)
+    chosen = []
+    for stratum, count in zip(strata, counts):
+        chosen.extend(rng.sample(stratum, count))
+    return sorted(chosen)
+
+
+def wilson_interval(correct, total, z=1.96):
+    """Wilson score interval for a binomial proportion."""
+    if total == 0:
+        return 0.0, 1.0
+    p = correct / total
+    denominator = 1 + z * z / total
+    centre = (p + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+class SequentialComparison:
+    """Sobel-Wald three-way sequential test on the items where exactly one model is right.
+
+    Two Wald SPRTs run side by side on the probability p that A wins a
+    discordant item: p = 0.5 vs p = 0.5 + delta, and p = 0.5 vs p = 0.5 - delta.
+    A is better if the first accepts its alternative, B if the second does,
+    and the models are tied once both have accepted p = 0.5. Items both models
+    get right (or wrong) carry no information about the difference and are
+    ignored.
+    """
+
+    def __init__(self, alpha=0.05, beta=0.05, delta=0.1, max_items=None):
+        self.up = math.log((0.5 + delta) / 0.5)
+        self.down = math.log((0.5 - delta) / 0.5)
+        self.upper = math.log((1 - beta) / alpha)
+        self.lower = math.log(beta / (1 - alpha))
+        self.max_items = max_items
+        self.items = 0
+        self.correct_a = 0
+        self.correct_b = 0
+        self.wins_a = 0
+        self.wins_b = 0
+        # Each one-sided test stops for good once it accepts p = 0.5
+        self.a_not_better = False
+        self.b_not_better = False
+
+    def update(self, a_correct, b_correct):
+        self.items += 1
+        self.correct_a += a_correct
+        self.correct_b += b_correct
+        if a_correct and not b_correct:
+            self.wins_a += 1
+        elif b_correct and not a_correct:
+            self.wins_b += 1
+        return self.decision()
+
+    @property
+    def log_likelihood_ratios(self):
+        """(LLR of A better vs equal, LLR of B better vs equal)."""
+        return (self.wins_a * self.up + self.wins_b * self.down,
+                self.wins_a * self.down + self.wins_b * self.up)
+
+    def decision(self):
+        """Return 'A', 'B', 'tie', 'undecided' (budget exhausted) or None to continue."""
+        a_ratio, b_ratio = self.log_likelihood_ratios
+        if not self.a_not_better:
+            if a_ratio >= self.upper:
+                return 'A'
+            self.a_not_better = a_ratio <= self.lower
+        if not self.b_not_better:
+            if b_ratio >= self.upper:
+                return 'B'
+            self.b_not_better = b_ratio <= self.lower
+        if self.a_not_better and self.b_not_better:
+            return 'tie'
+        if self.max_items is not None and self.items >= self.max_items:
+            return 'undecided'
+        return None
+
+
+def compare_models(model_a, model_b, items, labels, evaluate, test):
+    """Evaluate both models item by item until `test` reaches a decision."""
+    decision = None
+    for index, item in items:
+        record_a = evaluate(model_a, index, item)
+        record_b = evaluate(model_b, index, item)
+        if 'error' in record_a or 'error' in record_b:
+            continue
+        decision = test.update(record_a['prediction'] == labels[index],
+                               record_b['prediction'] == labels[index])
+        if decision:
+            break
+    return decision or 'undecided'
+
+
+def main():
+    from piqa_runner import evaluate_item, iter_items, load_labels
+
+    parser = argparse.ArgumentParser(description="Sequentially compare two models on a PIQA sample.")
+    parser.add_argument('model_a')
+    parser.add_argument('model_b')
+    parser.add_argument('--data', default='piqa/physicaliqa.jsonl')
+    parser.add_argument('--labels', default='piqa/physicaliqa-labels.lst')
+    parser.add_argument('--sample', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--delta', type=float, default=0.1,
+                        help="Indifference zone: smallest discordant win-rate edge worth detecting")
+    parser.add_argument('--alpha', type=float, default=0.05)
+    args = parser.parse_args()
+
+    labels = load_labels(args.labels)
+    if labels is None:
+        print(f"Sequential comparison needs labels; none found at {args.labels}")
+        return
+
+    items = list(iter_items(args.data))
+    chosen = stratified_sample(items, args.sample, args.seed)
+    # Shuffle so early stopping does not see the strata in order
+    random.Random(args.seed).shuffle(chosen)
+    sample = [items[index] for index in chosen]
+
+    test = SequentialComparison(alpha=args.alpha, beta=args.alpha, delta=args.delta, max_items=len(sample))
+    decision = compare_models(args.model_a, args.model_b, sample, labels, evaluate_item, test)
+
+    for name, correct in ((args.model_a, test.correct_a), (args.model_b, test.correct_b)):
+        low, high = wilson_interval(correct, test.items)
+        accuracy = correct / test.items if test.items else 0.0
+        print(f"{name}: accuracy {accuracy:.3f} (95% CI {low:.3f}-{high:.3f}) over {test.items} items")
+    winner = {'A': args.model_a, 'B': args.model_b}.get(decision)
+    if winner:
+        print(f"Decided after {test.items}/{len(sample)} items: {winner} is more accurate")
+    elif decision == 'tie':
+        print(f"Decided after {test.items}/{len(sample)} items: no difference; neither model wins "
+              f"more than {0.5 + args.delta:.2f} of the items they disagree on")
+    else:
+        print(f"No decision within {len(sample)} items; the sample ran out before the test "
+              f"could separate or tie the models")
+
+
+if __name__ == "__main__":
+    main()
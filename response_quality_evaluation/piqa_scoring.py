@@ -0,0 +1,96 @@
+import hashlib
+import os
+import sys
+import time
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ollama_client import get_client
+
+# Log-likelihood scoring for PIQA: rank sol1 vs sol2 by the conditional
+# log-probability the model assigns to each, which needs one prefill per
+# candidate and no decoding.
+
+CONTEXT_TEMPLATE = "Goal: {goal}\nSolution:"
+
+
+class OpenAICompatibleBackend:
+    """Scores continuations through an OpenAI-style /v1/completions endpoint.
+
+    The server must honour `echo` with `logprobs` so prompt tokens come back
+    scored (e.g. llama-cpp-python or vLLM servers).
+    """
+
+    def __init__(self, base_url='http://localhost:8080', timeout=None, client=None):
+        self.url = base_url.rstrip('/') + '/v1/completions'
+        self.timeout = timeout
+        self.client = client or get_client()
+
+    def continuation_logprob(self, model_name, context, continuation):
+        """Return (sum of continuation token logprobs, continuation token count)."""
+        data = self.client.post_json(
+            self.url,
+            {
+                'model': model_name,
+                'prompt': context + continuation,
+                # One token as in lm-eval; llama-cpp-python reads 0 as "up to n_ctx"
+                'max_tokens': 1,
+                'echo': True,
+                'logprobs': 1,
+                'temperature': 0
+            },
+            self.timeout
+        )
+        logprobs = data['choices'][0]['logprobs']
+
+        prompt_end = len(context + continuation)
+        total, count = 0.0, 0
+        for offset, logprob in zip(logprobs['text_offset'], logprobs['token_logprobs']):
+            # The first prompt token has no logprob; context and generated tokens are skipped
+            if len(context) <= offset < prompt_end and logprob is not None:
+                total += logprob
+                count += 1
+        return total, count
+
+
+class MockBackend:
+    """Deterministic stand-in for a logprob server, for dry runs without a model."""
+
+    def __init__(self, per_token=-2.0):
+        self.per_token = per_token
+
+    def continuation_logprob(self, model_name, context, continuation):
+        tokens = continuation.split()
+        digest = hashlib.sha256(f'{model_name}|{context}|{continuation}'.encode()).digest()
+        jitter = digest[0] / 255.0
+        return self.per_token * len(tokens) - jitter, max(len(tokens), 1)
+
+
+def score_item(backend, model_name, item, normalize=True):
+    """Return (prediction, [score1, score2]) for one PIQA item."""
+    context = CONTEXT_TEMPLATE.format(goal=item['goal'])
+    scores = []
+    for solution in (item['sol1'], item['sol2']):
+        logprob, count = backend.continuation_logprob(model_name, context, ' ' + solution)
+        scores.append(logprob / count if normalize and count else logprob)
+    prediction = 0 if scores[0] >= scores[1] else 1
+    return prediction, scores
+
+
+def make_loglik_evaluator(backend, normalize=True):
+    """Build an evaluate(model_name, index, item) callable for piqa_runner."""
+    def evaluate(model_name, index, item):
+        start_time = time.time()
+        try:
+            prediction, scores = score_item(backend, model_name, item, normalize)
+        except requests.exceptions.RequestException as e:
+            return {'index': index, 'id': item.get('id'), 'error': str(e)}
+        return {
+            'index': index,
+            'id': item.get('id'),
+            'prediction': prediction,
+            'scores': scores,
+            'seconds': time.time() - start_time
+        }
+    return evaluate
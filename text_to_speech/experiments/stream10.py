@@ -1,6 +1,4 @@
-import requests
 import subprocess
-import json
 import re
 import threading
 import queue
@@ -8,6 +6,11 @@ import io
 import tempfile
 import os
 import time
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ollama_client import get_client
+from tracing import span
 
 # Version 10: What is the biggest model you can run while still having a real-time experience?
 
@@ -65,16 +68,8 @@ class PiperTTS:
                 print(f"Audio Playback Error: {str(e)}")
 
 def stream_ollama(prompt):
-    url = "http://localhost:11434/api/generate"
-    data = {
-        "model": "qwen2:0.5b",
-        "prompt": prompt,
-        "stream": True
-    }
-    response = requests.post(url, json=data, stream=True)
-    for line in response.iter_lines():
-        if line:
-            yield json.loads(line)['response']
+    for chunk in get_client().generate_stream("qwen2:0.5b", prompt):
+        yield chunk['response']
 
 class SentenceBuffer:
     def __init__(self):
@@ -127,14 +122,16 @@ class TextProcessor:
         sentences = self.sentence_buffer.add_text(text)
         for sentence in sentences:
             # Generate audio data and add to queue
-            audio_data = self.tts.generate_audio(sentence)
+            with span('synthesize', chars=len(sentence)):
+                audio_data = self.tts.generate_audio(sentence)
             if audio_data:
                 self.audio_queue.put((sentence, audio_data))
     
     def finish(self):
         final_text = self.sentence_buffer.flush()
         if final_text:
-            audio_data = self.tts.generate_audio(final_text)
+            with span('synthesize', chars=len(final_text)):
+                audio_data = self.tts.generate_audio(final_text)
             if audio_data:
                 self.audio_queue.put((final_text, audio_data))
         self.audio_queue.put(None)  # Signal completion
@@ -147,16 +144,17 @@ def text_display_worker(print_queue):
         print(text, end='', flush=True)
         print_queue.task_done()
 
-def audio_player_worker(audio_queue):
+def audio_player_worker(audio_queue, tts=None):
     """Worker thread that plays pre-generated audio"""
-    tts = PiperTTS()
+    tts = tts or PiperTTS()
     while True:
         item = audio_queue.get()
         if item is None:
             break
         
         sentence, audio_data = item
-        tts.play_audio(audio_data)
+        with span('playback', chars=len(sentence)):
+            tts.play_audio(audio_data)
         audio_queue.task_done()
 
 def main():
@@ -172,8 +170,8 @@ def main():
     subprocess.run(["amixer", "sset", "PCM", "100%"], check=False)
     
     # Start worker threads
-    audio_thread = threading.Thread(target=audio_player_worker, args=(audio_queue,))
-    display_thread = threading.Thread(target=text_display_worker, args=(print_queue,))
+    audio_thread = threading.Thread(target=audio_player_worker, args=(audio_queue,), name='playback')
+    display_thread = threading.Thread(target=text_display_worker, args=(print_queue,), name='display')
     
     audio_thread.daemon = True
     display_thread.daemon = True
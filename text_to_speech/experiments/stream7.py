@@ -1,12 +1,15 @@
 import requests
 import subprocess
-import json
 import re
 import tempfile
 import os
 import threading
 import queue
 import time
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ollama_client import get_client
 
 # Version 7: Running cartesia & llm side by side, one sentence at a time
 
@@ -58,16 +61,8 @@ class CartesiaTTS:
             print(f"Error: {response.status_code} - {response.text}")
 
 def stream_ollama(prompt):
-    url = "http://localhost:11434/api/generate"
-    data = {
-        "model": "smollm:135m",
-        "prompt": prompt,
-        "stream": True
-    }
-    response = requests.post(url, json=data, stream=True)
-    for line in response.iter_lines():
-        if line:
-            yield json.loads(line)['response']
+    for chunk in get_client().generate_stream("smollm:135m", prompt):
+        yield chunk['response']
 
 class SentenceBuffer:
     def __init__(self):
@@ -1,10 +1,13 @@
-import requests
 import subprocess
-import json
 import re
 import threading
 import queue
 import io
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ollama_client import get_client
 
 # Version 8: Running piper-tts & llm side by side, one sentence at a time
 
@@ -45,16 +48,8 @@ class PiperTTS:
             print(f"TTS Error: {str(e)}")
 
 def stream_ollama(prompt):
-    url = "http://localhost:11434/api/generate"
-    data = {
-        "model": "smollm:135m",
-        "prompt": prompt,
-        "stream": True
-    }
-    response = requests.post(url, json=data, stream=True)
-    for line in response.iter_lines():
-        if line:
-            yield json.loads(line)['response']
+    for chunk in get_client().generate_stream("smollm:135m", prompt):
+        yield chunk['response']
 
 class SentenceBuffer:
     def __init__(self):
@@ -1,6 +1,4 @@
-import requests
 import subprocess
-import json
 import re
 import threading
 import queue
@@ -8,6 +6,10 @@ import io
 import tempfile
 import os
 import time
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ollama_client import get_client
 
 # Version 9: Running cartesia & llm side by side, one sentence at a time. Moreover, as voice is spoken, the next piece of audio is generated in parallel, creating a real-time generation as the generation time is shorter than the audio length.
 
@@ -65,16 +67,8 @@ class PiperTTS:
                 print(f"Audio Playback Error: {str(e)}")
 
 def stream_ollama(prompt):
-    url = "http://localhost:11434/api/generate"
-    data = {
-        "model": "smollm:135m",
-        "prompt": prompt,
-        "stream": True
-    }
-    response = requests.post(url, json=data, stream=True)
-    for line in response.iter_lines():
-        if line:
-            yield json.loads(line)['response']
+    for chunk in get_client().generate_stream("smollm:135m", prompt):
+        yield chunk['response']
 
 class SentenceBuffer:
     def __init__(self):
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ollama_client import get_client
+
+from stream10 import PiperTTS, TextProcessor, audio_player_worker
+
+# Record-and-replay of Ollama token streams. A recording keeps every NDJSON
+# chunk from stream_ollama with its arrival time, and replay re-emits it at
+# the original pace, sped up, or at a fixed tokens/sec rate. Sentence
+# segmentation, synthesis and playback can then be benchmarked
+# deterministically without a model server.
+
+EXPERIMENTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_PROMPT = "Tell me a short story. Make sure to use proper punctuation and complete sentences."
+
+
+def record_stream(model, prompt, output_path):
+    """Stream a generation, saving each chunk with its arrival time, and yield the text."""
+    with open(output_path, 'w') as file:
+        file.write(json.dumps({'model': model, 'prompt': prompt, 'recorded_at': time.time()}) + '\n')
+        start = time.perf_counter()
+        for chunk in get_client().generate_stream(model, prompt):
+            file.write(json.dumps({'t': time.perf_counter() - start, 'chunk': chunk}) + '\n')
+            yield chunk.get('response', '')
+
+
+def load_recording(path):
+    """Return (header, [(seconds since request, chunk), ...])."""
+    with open(path, 'r') as file:
+        header = json.loads(file.readline())
+        events = [json.loads(line) for line in file if line.strip()]
+    return header, [(event['t'], event['chunk']) for event in events]
+
+
+def replay_schedule(events, mode='original', speed=1.0, tokens_per_sec=None):
+    """Return the emit time of every event for the chosen replay mode.
+
+    original:    recorded timestamps
+    accelerated: recorded timestamps divided by `speed` (0 means no waiting)
+    rate:        recorded time to first token, then one token every 1/tokens_per_sec
+    """
+    if mode == 'original':
+        return [t for t, _ in events]
+    if mode == 'accelerated':
+        return [t / speed if speed else 0.0 for t, _ in events]
+    if mode == 'rate':
+        if not tokens_per_sec:
+            raise ValueError("rate mode needs tokens_per_sec")
+        first = events[0][0] if events else 0.0
+        return [first + i / tokens_per_sec for i in range(len(events))]
+    raise ValueError(f"unknown replay mode: {mode}")
+
+
+def replay_stream(path, mode='original', speed=1.0, tokens_per_sec=None):
+    """Yield recorded response text on the replay schedule, like stream_ollama does."""
+    _, events = load_recording(path)
+    schedule = replay_schedule(events, mode, speed, tokens_per_sec)
+    start = time.perf_counter()
+    for emit_at, (_, chunk) in zip(schedule, events):
+        delay = emit_at - (time.perf_counter() - start)
+        if delay > 0:
+            time.sleep(delay)
+        yield chunk.get('response', '')
+
+
+class SimulatedSpeaker:
+    """Stands in for aplay by sleeping for the length of the audio."""
+
+    def __init__(self, sample_rate=22050, sample_width=2):
+        self.bytes_per_second = sample_rate * sample_width
+
+    def play_audio(self, audio_data):
+        if audio_data:
+            time.sleep(len(audio_data) / self.bytes_per_second)
+
+
+def _drain(print_queue):
+    while print_queue.get() is not None:
+        pass
+
+
+def bench_pipeline(token_stream, play=False):
+    """Run stream10's pipeline over a token stream and time it.
+
+    As in stream10.main, sentences are synthesized on the token thread and
+    played on a worker behind a 3-slot queue. Without `play`, playback is
+    simulated by sleeping for each clip's duration, so back-pressure is kept.
+    """
+    audio_queue = queue.Queue(maxsize=3)
+    print_queue = queue.Queue()
+    text_processor = TextProcessor(audio_queue, print_queue)
+    text_processor.tts.model = os.path.join(EXPERIMENTS_DIR, text_processor.tts.model)
+    metrics = {'tokens': 0, 'sentences': 0, 'synthesis_seconds': 0.0, 'blocked_seconds': 0.0}
+    start = time.perf_counter()
+
+    generate_audio = text_processor.tts.generate_audio
+
+    def timed_generate_audio(text):
+        synth_start = time.perf_counter()
+        metrics['sentences'] += 1
+        metrics.setdefault('first_sentence', synth_start - start)
+        audio_data = generate_audio(text)
+        metrics['synthesis_seconds'] += time.perf_counter() - synth_start
+        if audio_data:
+            metrics.setdefault('first_audio', time.perf_counter() - start)
+        return audio_data
+
+    text_processor.tts.generate_audio = timed_generate_audio
+
+    class TimedSpeaker:
+        def __init__(self, speaker):
+            self.speaker = speaker
+
+        def play_audio(self, audio_data):
+            metrics.setdefault('first_playback', time.perf_counter() - start)
+            self.speaker.play_audio(audio_data)
+
+    speaker = TimedSpeaker(PiperTTS() if play else SimulatedSpeaker())
+    audio_thread = threading.Thread(target=audio_player_worker, args=(audio_queue, speaker),
+                                    name='playback', daemon=True)
+    display_thread = threading.Thread(target=_drain, args=(print_queue,), name='display', daemon=True)
+    audio_thread.start()
+    display_thread.start()
+
+    for text in token_stream:
+        if not text:
+            continue
+        metrics['tokens'] += 1
+        metrics.setdefault('first_token', time.perf_counter() - start)
+        # Time the token thread spends in segmentation, synthesis and waiting on the audio queue
+        process_start = time.perf_counter()
+        text_processor.process_text(text)
+        metrics['blocked_seconds'] += time.perf_counter() - process_start
+    text_processor.finish()
+    print_queue.put(None)
+    audio_thread.join()
+    display_thread.join()
+    metrics['total'] = time.perf_counter() - start
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay Ollama token streams.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help="Record a live generation")
+    record_parser.add_argument('output')
+    record_parser.add_argument('--model', default='qwen2:0.5b')
+    record_parser.add_argument('--prompt', default=DEFAULT_PROMPT)
+
+    for name, help_text in (('replay', "Print a recording on its replay schedule"),
+                            ('bench', "Benchmark segmentation/synthesis against a recording")):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('recording')
+        sub.add_argument('--mode', choices=['original', 'accelerated', 'rate'], default='original')
+        sub.add_argument('--speed', type=float, default=1.0, help="Speed-up for accelerated mode (0 = no waiting)")
+        sub.add_argument('--tokens-per-sec', type=float, default=None, help="Token rate for rate mode")
+        if name == 'bench':
+            sub.add_argument('--play', action='store_true',
+                             help="Play the audio with aplay instead of sleeping for its duration")
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        for text in record_stream(args.model, args.prompt, args.output):
+            print(text, end='', flush=True)
+        print(f"\n\nRecording saved to {args.output}")
+        return
+
+    token_stream = replay_stream(args.recording, args.mode, args.speed, args.tokens_per_sec)
+    if args.command == 'replay':
+        for text in token_stream:
+            print(text, end='', flush=True)
+        print()
+        return
+
+    metrics = bench_pipeline(token_stream, args.play)
+    print(f"Tokens: {metrics['tokens']}, sentences: {metrics['sentences']}")
+    for key in ('first_token', 'first_sentence', 'first_audio', 'first_playback', 'blocked_seconds', 'total'):
+        if key in metrics:
+            print(f"  {key:<16}{metrics[key] * 1000:>10.1f} ms")
+    if metrics['sentences'] and metrics['synthesis_seconds']:
+        print(f"  Mean synthesis per sentence: {metrics['synthesis_seconds'] / metrics['sentences'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
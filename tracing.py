@@ -0,0 +1,132 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+# Minimal span tracer writing Chrome trace JSON (open in https://ui.perfetto.dev
+# or chrome://tracing). Disabled by default: span() then hands back a shared
+# no-op context manager, so instrumented code pays one attribute check.
+#
+# Enable with LEMONADE_TRACE=trace.json or tracing.enable('trace.json').
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """A timed section of work on the current thread."""
+
+    __slots__ = ('tracer', 'name', 'attrs', 'start')
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs['error'] = repr(exc)
+        self.tracer._add('X', self.name, self.start, self.attrs, dur=end - self.start)
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes known only once the work is under way."""
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.events = []
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.named_threads = set()
+        self.lock = threading.Lock()
+
+    def enable(self, path='trace.json'):
+        """Start recording; events are written to `path` by save() or at exit."""
+        if not self.enabled:
+            atexit.register(self.save)
+        self.enabled = True
+        self.path = path
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def instant(self, name, **attrs):
+        """Record a point-in-time event, e.g. a token arriving."""
+        if self.enabled:
+            self._add('i', name, time.perf_counter(), attrs, s='t')
+
+    def counter(self, name, **values):
+        """Record numeric values plotted as a counter track."""
+        if self.enabled:
+            self._add('C', name, time.perf_counter(), values)
+
+    def _add(self, phase, name, start, attrs, **extra):
+        tid = threading.get_native_id()
+        if tid not in self.named_threads:
+            with self.lock:
+                if tid not in self.named_threads:
+                    self.named_threads.add(tid)
+                    self.events.append({
+                        'ph': 'M', 'name': 'thread_name', 'pid': self.pid, 'tid': tid,
+                        'args': {'name': threading.current_thread().name}
+                    })
+        event = {
+            'ph': phase,
+            'name': name,
+            'pid': self.pid,
+            'tid': tid,
+            'ts': (start - self.origin) * 1e6,
+            'args': attrs
+        }
+        if 'dur' in extra:
+            extra['dur'] = extra['dur'] * 1e6
+        event.update(extra)
+        # list.append is atomic, so recording threads don't contend on a lock
+        self.events.append(event)
+
+    def save(self, path=None):
+        """Write recorded events as Chrome trace JSON and return the path."""
+        path = path or self.path
+        if not path or not self.events:
+            return None
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}, file, default=str)
+        return path
+
+
+tracer = Tracer()
+span = tracer.span
+instant = tracer.instant
+counter = tracer.counter
+
+
+def enable(path='trace.json'):
+    tracer.enable(path)
+
+
+if os.environ.get('LEMONADE_TRACE'):
+    enable(os.environ['LEMONADE_TRACE'])
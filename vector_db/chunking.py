@@ -0,0 +1,130 @@
+import re
+
+# Token-aware chunking: pack paragraphs into chunks close to a token budget
+# so every index entry is a useful size for the embedding model.
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+
+def count_tokens(text):
+    """Approximate token count: words and punctuation marks."""
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def iter_paragraphs(file_path):
+    """Yield blank-line separated paragraphs without reading the whole file."""
+    lines = []
+    with open(file_path, 'r') as file:
+        for line in file:
+            if line.strip():
+                lines.append(line.strip())
+            elif lines:
+                yield ' '.join(lines)
+                lines = []
+    if lines:
+        yield ' '.join(lines)
+
+
+def _split_words(text, max_tokens, count_tokens):
+    words = text.split()
+    window, window_tokens = [], 0
+    for word in words:
+        word_tokens = count_tokens(word)
+        if window and window_tokens + word_tokens > max_tokens:
+            yield ' '.join(window), window_tokens
+            window, window_tokens = [], 0
+        window.append(word)
+        window_tokens += word_tokens
+    if window:
+        yield ' '.join(window), window_tokens
+
+
+def _pieces(paragraph, max_tokens, count_tokens):
+    """Yield (text, tokens, starts_paragraph) pieces no larger than max_tokens."""
+    tokens = count_tokens(paragraph)
+    if tokens <= max_tokens:
+        yield paragraph, tokens, True
+        return
+
+    first = True
+    for sentence in SENTENCE_SPLIT.split(paragraph):
+        if not sentence:
+            continue
+        sentence_tokens = count_tokens(sentence)
+        if sentence_tokens <= max_tokens:
+            yield sentence, sentence_tokens, first
+        else:
+            for window, window_tokens in _split_words(sentence, max_tokens, count_tokens):
+                yield window, window_tokens, first
+                first = False
+        first = False
+
+
+def _join(pieces):
+    text = ''
+    for piece, _, starts_paragraph in pieces:
+        if text:
+            text += '\n\n' if starts_paragraph else ' '
+        text += piece
+    return text
+
+
+def _tail_words(text, max_tokens, count_tokens):
+    """Return the trailing words of text that fit in max_tokens."""
+    tail, tail_tokens = [], 0
+    for word in reversed(text.split()):
+        word_tokens = count_tokens(word)
+        if tail_tokens + word_tokens > max_tokens:
+            break
+        tail.insert(0, word)
+        tail_tokens += word_tokens
+    return ' '.join(tail), tail_tokens
+
+
+def _overlap(pieces, budget, count_tokens):
+    """Return the trailing `budget` tokens of pieces, cutting the first one by words."""
+    carry, carry_tokens = [], 0
+    for text, tokens, starts_paragraph in reversed(pieces):
+        if budget - carry_tokens <= 0:
+            break
+        if carry_tokens + tokens <= budget:
+            carry.insert(0, (text, tokens, starts_paragraph))
+            carry_tokens += tokens
+            continue
+        tail, tail_tokens = _tail_words(text, budget - carry_tokens, count_tokens)
+        if tail:
+            carry.insert(0, (tail, tail_tokens, False))
+            carry_tokens += tail_tokens
+        break
+    return carry, carry_tokens
+
+
+def chunk_paragraphs(paragraphs, max_tokens=200, overlap=30, count_tokens=count_tokens):
+    """Pack paragraphs into chunks of at most max_tokens.
+
+    Small paragraphs are merged, oversized ones are split on sentence
+    boundaries (or words, for run-on sentences), and each chunk repeats the
+    last `overlap` tokens of the previous one.
+    """
+    current, current_tokens = [], 0
+    for paragraph in paragraphs:
+        for piece in _pieces(paragraph, max_tokens, count_tokens):
+            piece_tokens = piece[1]
+            if current and current_tokens + piece_tokens > max_tokens:
+                yield _join(current)
+
+                budget = min(overlap, max_tokens - piece_tokens)
+                carry, carry_tokens = _overlap(current, budget, count_tokens)
+                current, current_tokens = carry, carry_tokens
+
+            current.append(piece)
+            current_tokens += piece_tokens
+
+    if current:
+        yield _join(current)
+
+
+def chunk_file(file_path, max_tokens=200, overlap=30, count_tokens=count_tokens):
+    """Stream token-bounded chunks from a text file."""
+    return chunk_paragraphs(iter_paragraphs(file_path), max_tokens, overlap, count_tokens)
@@ -1,6 +1,7 @@
 # Extract text into paragraphs
 
 import re
+from chunking import chunk_file
 
 def extract_paragraphs(file_path):
     with open(file_path, 'r') as file:
@@ -9,9 +10,13 @@ def extract_paragraphs(file_path):
         return [p.strip() for p in paragraphs if p.strip()]
 
 file_path = 'data/the-creative-act.txt'
-paragraph_list = extract_paragraphs(file_path)
+# paragraph_list = extract_paragraphs(file_path)
 # print(paragraph_list)
 
+# Chunks target a token budget instead of raw paragraph boundaries
+max_chunk_tokens = 200
+chunk_overlap_tokens = 30
+
 # Turn paragraphs into vector
 
 import chromadb
@@ -22,15 +27,19 @@ data_name = 'the-creative-act'
 
 collection = client.get_or_create_collection(data_name)
 
-
-# Generate unique IDs for each document
-ids = [f"doc_{uuid.uuid4().hex}" for _ in range(len(paragraph_list))]
+def add_in_batches(collection, chunks, batch_size=64):
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            # Generate unique IDs for each document
+            collection.add(documents=batch, ids=[f"doc_{uuid.uuid4().hex}" for _ in batch])
+            batch = []
+    if batch:
+        collection.add(documents=batch, ids=[f"doc_{uuid.uuid4().hex}" for _ in batch])
 
 # Now add the documents to the collection
-collection.add(
-    documents=paragraph_list,
-    ids=ids,
-)
+add_in_batches(collection, chunk_file(file_path, max_chunk_tokens, chunk_overlap_tokens))
 results = collection.query(
     query_texts=["What is the book 'Creative Act' about?"],
     n_results=2,
@@ -1,19 +1,49 @@
+import os
+import sys
+import time
+
 from llama_index.core import VectorStoreIndex, SimpleDirectoryReader, Settings
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.llms.ollama import Ollama
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from semantic_cache import SemanticCache
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ollama_client import OLLAMA_URL, READ_TIMEOUT
+
 documents = SimpleDirectoryReader("data").load_data()
 
 # bge-base embedding model
 Settings.embed_model = HuggingFaceEmbedding(model_name="BAAI/bge-base-en-v1.5")
 
 # ollama
-Settings.llm = Ollama(model="tinyllama", request_timeout=360.0)
+# llama_index talks to Ollama through its own client; share our endpoint and timeout
+Settings.llm = Ollama(model="tinyllama", base_url=OLLAMA_URL, request_timeout=READ_TIMEOUT)
 
 index = VectorStoreIndex.from_documents(
     documents,
 )
 
 query_engine = index.as_query_engine()
-response = query_engine.query("What did the author do growing up?")
-print(response)
\ No newline at end of file
+
+# Similar questions reuse the cached answer instead of a full generation
+cache = SemanticCache(Settings.embed_model.get_query_embedding, threshold=0.92, ttl=3600.0)
+
+def cached_query(question):
+    embedding = Settings.embed_model.get_query_embedding(question)
+    entry = cache.lookup(question, embedding=embedding, field='answer')
+    if entry is not None:
+        return entry['answer'], True
+    response = query_engine.query(question)
+    context = [node.get_content() for node in response.source_nodes]
+    cache.store(question, context=context, answer=str(response), embedding=embedding)
+    return str(response), False
+
+for question in ["What did the author do growing up?", "What did the author do when growing up?"]:
+    start = time.perf_counter()
+    answer, hit = cached_query(question)
+    print(answer)
+    print(f"[{'cache hit' if hit else 'cache miss'}] {time.perf_counter() - start:.2f}s")
+
+print(cache.stats())
\ No newline at end of file
@@ -0,0 +1,233 @@
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+import chromadb
+import requests
+from chromadb.utils import embedding_functions
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ollama_client import get_client
+import tracing
+from tracing import span
+
+# End-to-end RAG: retrieve context from chroma, stream an answer from Ollama
+# and optionally speak it, timing every stage on the way.
+
+TTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'text_to_speech', 'experiments')
+
+STAGES = [
+    'embed_query',
+    'vector_search',
+    'prompt_assembly',
+    'ttft',
+    'decode',
+    'tts_first_audio',
+]
+
+PROMPT_TEMPLATE = """Answer the question using only the context below. Keep the answer short and use complete sentences.
+
+Context:
+{context}
+
+Question: {question}
+Answer:"""
+
+
+def get_collection(name, embedding_function):
+    """Open the chroma collection filled by import_data.py."""
+    client = chromadb.HttpClient()
+    return client.get_or_create_collection(name, embedding_function=embedding_function)
+
+
+def retrieve(collection, embedding_function, question, n_results, timings):
+    """Embed the question and fetch the closest documents."""
+    start = time.perf_counter()
+    with span('embed_query'):
+        query_embedding = embedding_function([question])
+    timings['embed_query'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with span('vector_search', n_results=n_results):
+        results = collection.query(query_embeddings=query_embedding, n_results=n_results)
+    timings['vector_search'] = time.perf_counter() - start
+
+    return results['documents'][0] if results.get('documents') else []
+
+
+def build_prompt(question, documents):
+    """Assemble the generation prompt from retrieved documents."""
+    context = "\n\n".join(documents)
+    return PROMPT_TEMPLATE.format(context=context, question=question)
+
+
+def stream_ollama(model, prompt):
+    """Yield every NDJSON chunk of a streamed Ollama generation."""
+    return get_client().generate_stream(model, prompt)
+
+
+class Speaker:
+    """Synthesizes and plays sentences off the generation thread."""
+
+    def __init__(self, start_time, timings):
+        if TTS_DIR not in sys.path:
+            sys.path.append(TTS_DIR)
+        from stream10 import PiperTTS, SentenceBuffer
+
+        self.start_time = start_time
+        self.timings = timings
+        self.first_token_time = None
+        self.tts = PiperTTS()
+        # piper resolves the voice relative to the working directory
+        self.tts.model = os.path.join(TTS_DIR, self.tts.model)
+        self.sentence_buffer = SentenceBuffer()
+        self.text_queue = queue.Queue()
+        self.audio_queue = queue.Queue(maxsize=3)
+        self.synth_thread = threading.Thread(target=self._synthesize_worker, name='synthesize', daemon=True)
+        self.play_thread = threading.Thread(target=self._play_worker, name='playback', daemon=True)
+        self.synth_thread.start()
+        self.play_thread.start()
+
+    def add_text(self, text):
+        if self.first_token_time is None:
+            self.first_token_time = time.perf_counter()
+        for sentence in self.sentence_buffer.add_text(text):
+            self.text_queue.put(sentence)
+
+    def finish(self):
+        final_text = self.sentence_buffer.flush()
+        if final_text:
+            self.text_queue.put(final_text)
+        self.text_queue.put(None)
+        self.synth_thread.join()
+        self.play_thread.join()
+
+    def _synthesize_worker(self):
+        while True:
+            sentence = self.text_queue.get()
+            if sentence is None:
+                break
+            with span('synthesize', chars=len(sentence)):
+                audio_data = self.tts.generate_audio(sentence)
+            if audio_data and 'tts_first_audio' not in self.timings:
+                now = time.perf_counter()
+                self.timings['tts_first_audio'] = now - self.first_token_time
+                self.timings['time_to_first_audio'] = now - self.start_time
+            if audio_data:
+                self.audio_queue.put(audio_data)
+        self.audio_queue.put(None)
+
+    def _play_worker(self):
+        while True:
+            audio_data = self.audio_queue.get()
+            if audio_data is None:
+                break
+            with span('playback', bytes=len(audio_data)):
+                self.tts.play_audio(audio_data)
+
+
+def run_pipeline(question, collection, embedding_function, model, n_results=2, speak=False, echo=True):
+    """Answer one question and return (answer, timings in seconds)."""
+    timings = {}
+    start_time = time.perf_counter()
+
+    documents = retrieve(collection, embedding_function, question, n_results, timings)
+
+    start = time.perf_counter()
+    with span('prompt_assembly', documents=len(documents)):
+        prompt = build_prompt(question, documents)
+    timings['prompt_assembly'] = time.perf_counter() - start
+
+    speaker = Speaker(start_time, timings) if speak else None
+
+    answer = []
+    request_time = time.perf_counter()
+    first_token_time = None
+    final_chunk = {}
+    for chunk in stream_ollama(model, prompt):
+        text = chunk.get('response', '')
+        if text and first_token_time is None:
+            first_token_time = time.perf_counter()
+            timings['ttft'] = first_token_time - request_time
+        if text:
+            answer.append(text)
+            if echo:
+                print(text, end='', flush=True)
+            if speaker:
+                speaker.add_text(text)
+        if chunk.get('done'):
+            final_chunk = chunk
+    end_time = time.perf_counter()
+    if echo:
+        print()
+
+    if first_token_time is not None:
+        timings['decode'] = end_time - first_token_time
+    timings['prompt_tokens'] = final_chunk.get('prompt_eval_count', 0)
+    timings['eval_tokens'] = final_chunk.get('eval_count', 0)
+
+    if speaker:
+        speaker.finish()
+    timings['total'] = time.perf_counter() - start_time
+
+    return ''.join(answer), timings
+
+
+def print_breakdown(timings):
+    """Print per-stage latency in milliseconds."""
+    print("\nStage breakdown:")
+    for stage in STAGES:
+        if stage in timings:
+            print(f"  {stage:<20}{timings[stage] * 1000:>10.1f} ms")
+        else:
+            print(f"  {stage:<20}{'N/A':>10}")
+    if 'time_to_first_audio' in timings:
+        print(f"  {'time_to_first_audio':<20}{timings['time_to_first_audio'] * 1000:>10.1f} ms")
+    print(f"  {'total':<20}{timings['total'] * 1000:>10.1f} ms")
+    if 'embedder_load' in timings:
+        print(f"  {'embedder_load':<20}{timings['embedder_load'] * 1000:>10.1f} ms (one-off, before the query)")
+    if timings.get('decode') and timings.get('eval_tokens'):
+        print(f"  Decode tokens/sec: {timings['eval_tokens'] / timings['decode']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieve, generate and optionally speak an answer.")
+    parser.add_argument('question', nargs='?', default="What is the book 'Creative Act' about?")
+    parser.add_argument('--model', default='tinyllama')
+    parser.add_argument('--collection', default='the-creative-act')
+    parser.add_argument('--n-results', type=int, default=2)
+    parser.add_argument('--speak', action='store_true', help="Speak the answer with piper")
+    parser.add_argument('--trace', default=None, help="Write a Chrome trace JSON to this path")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracing.enable(args.trace)
+
+    embedding_function = embedding_functions.DefaultEmbeddingFunction()
+    # The ONNX model loads on the first call; keep that out of embed_query
+    start = time.perf_counter()
+    with span('embedder_load'):
+        embedding_function(["warm up"])
+    embedder_load = time.perf_counter() - start
+    collection = get_collection(args.collection, embedding_function)
+
+    try:
+        answer, timings = run_pipeline(
+            args.question, collection, embedding_function, args.model,
+            n_results=args.n_results, speak=args.speak
+        )
+    except requests.exceptions.RequestException as e:
+        print(f"Error querying model {args.model}: {e}")
+        return
+
+    timings['embedder_load'] = embedder_load
+    print_breakdown(timings)
+    if args.trace:
+        print(f"Trace written to {tracing.tracer.save()}")
+
+
+if __name__ == "__main__":
+    main()
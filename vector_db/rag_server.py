@@ -0,0 +1,399 @@
+import argparse
+import json
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from semantic_cache import SemanticCache
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ollama_client import get_client
+
+# Resident RAG query server. Pays the imports, embedder load and index build
+# once, then answers questions over local HTTP:
+#
+#   POST /query  {"question": "...", "model": "tinyllama", "n_results": 2}
+#                streams NDJSON: {"context": [...]}, {"response": "..."}..., {"done": true, "timings": {...}}
+#   GET  /stats  startup cost, per-query latency, embedding batch sizes and context cache hits
+#
+# The default stack is llamaindex/v2.py's: bge-base embeddings over an
+# in-memory llama_index index of llamaindex/data. `--stack chroma` serves the
+# chroma collection filled by import_data.py instead.
+#
+# Retrieved context is kept in a semantic cache, so a question close to one
+# already asked skips the vector search.
+#
+# `python rag_server.py bench` compares time to context and time to first
+# token of a cold process with warm queries against a running server.
+
+DEFAULT_QUESTION = "What is this document about?"
+LLAMAINDEX_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'llamaindex', 'data')
+BGE_MODEL = 'BAAI/bge-base-en-v1.5'
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent query embeddings into one embedding call."""
+
+    def __init__(self, embedding_function, max_batch=16, window=0.01):
+        self.embedding_function = embedding_function
+        self.max_batch = max_batch
+        self.window = window
+        self.requests = queue.Queue()
+        self.batch_sizes = []
+        threading.Thread(target=self._run, name='embed-batcher', daemon=True).start()
+
+    def embed(self, text):
+        future = Future()
+        self.requests.put((text, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self.requests.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.batch_sizes.append(len(batch))
+            try:
+                embeddings = self.embedding_function([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+
+class LlamaIndexStack:
+    """The llamaindex/v2.py retrieval stack: bge embeddings over a llama_index index."""
+
+    def __init__(self, data_dir=LLAMAINDEX_DATA, embed_model=BGE_MODEL, max_batch=16):
+        start = time.perf_counter()
+        from llama_index.core import QueryBundle, Settings, SimpleDirectoryReader, VectorStoreIndex
+        from llama_index.core.prompts.default_prompts import DEFAULT_TEXT_QA_PROMPT
+        from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+        from llama_index.embeddings.huggingface.utils import get_query_instruct_for_model_name
+        self.timings = {'imports': time.perf_counter() - start}
+        self.QueryBundle = QueryBundle
+        self.prompt_template = DEFAULT_TEXT_QA_PROMPT
+
+        step = time.perf_counter()
+        # embed_batch_size >= the batcher's max_batch keeps a batch to one encoder call
+        self.embed_model = HuggingFaceEmbedding(model_name=embed_model, embed_batch_size=max_batch)
+        Settings.embed_model = self.embed_model
+        # The instruction get_query_embedding would prepend for bge queries
+        self.query_instruction = (self.embed_model.query_instruction
+                                  or get_query_instruct_for_model_name(embed_model) or '')
+        self.embed(["warm up"])
+        self.timings['embedder'] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        documents = SimpleDirectoryReader(data_dir).load_data()
+        self.index = VectorStoreIndex.from_documents(documents)
+        self.timings['index'] = time.perf_counter() - step
+
+    def embed(self, questions):
+        # llama_index only embeds queries one at a time; adding the query
+        # instruction ourselves lets a whole batch go through one encoder call
+        return self.embed_model.get_text_embedding_batch(
+            [self.query_instruction + question for question in questions])
+
+    def search(self, question, embedding, n_results):
+        retriever = self.index.as_retriever(similarity_top_k=n_results)
+        nodes = retriever.retrieve(self.QueryBundle(query_str=question, embedding=embedding))
+        return [node.get_content() for node in nodes]
+
+    def build_prompt(self, question, documents):
+        return self.prompt_template.format(context_str="\n\n".join(documents), query_str=question)
+
+
+class ChromaStack:
+    """The rag_pipeline.py retrieval stack: chroma's default embedder and collection."""
+
+    def __init__(self, collection_name='the-creative-act'):
+        start = time.perf_counter()
+        from chromadb.utils import embedding_functions
+        import rag_pipeline
+        self.timings = {'imports': time.perf_counter() - start}
+        self.pipeline = rag_pipeline
+
+        step = time.perf_counter()
+        self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        # The ONNX model loads lazily; pay for it now instead of on the first query
+        self.embedding_function(["warm up"])
+        self.timings['embedder'] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        self.collection = rag_pipeline.get_collection(collection_name, self.embedding_function)
+        self.timings['index'] = time.perf_counter() - step
+
+    def embed(self, questions):
+        return self.embedding_function(questions)
+
+    def search(self, question, embedding, n_results):
+        results = self.collection.query(query_embeddings=[embedding], n_results=n_results)
+        return results['documents'][0] if results.get('documents') else []
+
+    def build_prompt(self, question, documents):
+        return self.pipeline.build_prompt(question, documents)
+
+
+class RagService:
+    def __init__(self, stack, default_model, max_batch=16, window=0.01,
+                 cache_threshold=0.92, cache_ttl=3600.0, collection_name='the-creative-act'):
+        start = time.perf_counter()
+        if stack == 'chroma':
+            self.stack = ChromaStack(collection_name)
+        else:
+            self.stack = LlamaIndexStack(max_batch=max_batch)
+        self.startup = dict(self.stack.timings)
+
+        self.batcher = EmbeddingBatcher(self.stack.embed, max_batch, window)
+        self.default_model = default_model
+        self.startup['total'] = time.perf_counter() - start
+        self.latencies = []
+        self.lock = threading.Lock()
+        # One cache per n_results so a hit always has the requested number of documents
+        self.cache_threshold = cache_threshold
+        self.cache_ttl = cache_ttl
+        self.caches = {}
+
+    def answer(self, question, model=None, n_results=2):
+        """Yield the retrieved context, then answer chunks, then timings."""
+        timings = {}
+        start = time.perf_counter()
+        query_embedding = self.batcher.embed(question)
+        timings['embed_query'] = time.perf_counter() - start
+
+        step = time.perf_counter()
+        with self.lock:
+            cache = self.caches.setdefault(
+                n_results, SemanticCache(self.batcher.embed, self.cache_threshold, self.cache_ttl))
+            entry = cache.lookup(question, embedding=query_embedding, field='context')
+        if entry is not None:
+            documents = entry['context']
+        else:
+            documents = self.stack.search(question, query_embedding, n_results)
+            with self.lock:
+                cache.store(question, context=documents, embedding=query_embedding)
+        timings['vector_search'] = time.perf_counter() - step
+        timings['context_cache_hit'] = entry is not None
+        yield {'context': documents}
+
+        prompt = self.stack.build_prompt(question, documents)
+        request_time = time.perf_counter()
+        for chunk in get_client().generate_stream(model or self.default_model, prompt):
+            if chunk.get('response'):
+                timings.setdefault('ttft', time.perf_counter() - request_time)
+                yield {'response': chunk['response']}
+        timings['total'] = time.perf_counter() - start
+        with self.lock:
+            self.latencies.append(timings['total'])
+        yield {'done': True, 'timings': timings}
+
+    def stats(self):
+        with self.lock:
+            latencies = list(self.latencies)
+            cache_stats = {n_results: cache.stats() for n_results, cache in self.caches.items()}
+        batch_sizes = list(self.batcher.batch_sizes)
+        return {
+            'startup_seconds': self.startup,
+            'queries': len(latencies),
+            'mean_latency': statistics.mean(latencies) if latencies else None,
+            'median_latency': statistics.median(latencies) if latencies else None,
+            'embed_batches': len(batch_sizes),
+            'mean_embed_batch': statistics.mean(batch_sizes) if batch_sizes else None,
+            'context_cache': cache_stats
+        }
+
+
+def make_handler(service):
+    class RagHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self._send_json(200, service.stats())
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/query':
+                self._send_json(404, {'error': 'not found'})
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                request = json.loads(self.rfile.read(length) or b'{}')
+                question = request['question']
+            except (json.JSONDecodeError, KeyError):
+                self._send_json(400, {'error': 'expected JSON with a "question" field'})
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.end_headers()
+            messages = service.answer(question, request.get('model'), int(request.get('n_results', 2)))
+            try:
+                for message in messages:
+                    self.wfile.write(json.dumps(message).encode() + b'\n')
+                    self.wfile.flush()
+            except requests.exceptions.RequestException as e:
+                self.wfile.write(json.dumps({'error': str(e)}).encode() + b'\n')
+            except (BrokenPipeError, ConnectionResetError):
+                # The client stopped reading (bench does after the first token)
+                pass
+            finally:
+                # Closes the Ollama stream too
+                messages.close()
+
+        def log_message(self, format, *args):
+            pass
+
+    return RagHandler
+
+
+def first_token_timings(lines, start):
+    """Read NDJSON lines until the first answer token.
+
+    Returns (seconds to context, seconds to first token) measured from `start`.
+    """
+    time_to_context = None
+    for line in lines:
+        try:
+            message = json.loads(line)
+        except ValueError:
+            # Blank keep-alive lines, or library chatter on a cold process's stdout
+            continue
+        if 'error' in message:
+            raise RuntimeError(message['error'])
+        if 'context' in message:
+            time_to_context = time.perf_counter() - start
+        if message.get('response'):
+            return time_to_context, time.perf_counter() - start
+    return time_to_context, None
+
+
+def query_server(url, question, model=None):
+    """Send one query and return (seconds to context, seconds to first token)."""
+    start = time.perf_counter()
+    payload = {'question': question}
+    if model:
+        payload['model'] = model
+    with requests.post(f'{url}/query', json=payload, stream=True, timeout=(5, 360)) as response:
+        response.raise_for_status()
+        # Stop at the first token so generation length doesn't swamp the comparison
+        return first_token_timings(response.iter_lines(), start)
+
+
+def cold_query(question, model, stack):
+    """Answer one question in a new process and time it like query_server."""
+    start = time.perf_counter()
+    command = [sys.executable, os.path.abspath(__file__), 'once', '--question', question,
+               '--model', model, '--stack', stack]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        return first_token_timings(process.stdout, start)
+    finally:
+        process.kill()
+        process.wait()
+
+
+def bench(url, question, model, runs, stack):
+    """Compare time to context and to first token of a cold process and warm server queries."""
+    cold_context, cold_ttft = cold_query(question, model, stack)
+
+    warm = [query_server(url, question, model) for _ in range(runs)]
+    warm_context = statistics.median(context for context, _ in warm)
+    warm_ttft = statistics.median(ttft for _, ttft in warm)
+
+    print(f"{'':<20}{'context':>10}{'first token':>14}")
+    print(f"{'Cold (new process)':<20}{cold_context:>9.2f}s{cold_ttft:>13.2f}s")
+    print(f"{'Warm (server)':<20}{warm_context:>9.2f}s{warm_ttft:>13.2f}s  median over {runs} queries")
+    print(f"Startup avoided:    {cold_ttft - warm_ttft:.2f}s to first token")
+
+
+def add_service_arguments(parser):
+    parser.add_argument('--stack', choices=['llamaindex', 'chroma'], default='llamaindex',
+                        help="llamaindex: v2.py's bge index; chroma: import_data.py's collection")
+    parser.add_argument('--collection', default='the-creative-act', help="Chroma collection for --stack chroma")
+    parser.add_argument('--model', default='tinyllama')
+    parser.add_argument('--max-batch', type=int, default=16)
+    parser.add_argument('--batch-window-ms', type=float, default=10.0)
+    parser.add_argument('--cache-threshold', type=float, default=0.92,
+                        help="Cosine similarity for reusing cached context")
+    parser.add_argument('--cache-ttl', type=float, default=3600.0)
+
+
+def make_service(args):
+    return RagService(args.stack, args.model, args.max_batch, args.batch_window_ms / 1000,
+                      args.cache_threshold, args.cache_ttl, args.collection)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident RAG query server.")
+    subparsers = parser.add_subparsers(dest='command')
+
+    serve_parser = subparsers.add_parser('serve', help="Run the server (default)")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8700)
+    add_service_arguments(serve_parser)
+
+    once_parser = subparsers.add_parser('once', help="Answer one question as NDJSON on stdout and exit")
+    once_parser.add_argument('--question', default=DEFAULT_QUESTION)
+    add_service_arguments(once_parser)
+
+    bench_parser = subparsers.add_parser('bench', help="Compare cold and warm time to first token")
+    bench_parser.add_argument('--url', default='http://127.0.0.1:8700')
+    bench_parser.add_argument('--question', default=DEFAULT_QUESTION)
+    bench_parser.add_argument('--model', default='tinyllama')
+    bench_parser.add_argument('--stack', choices=['llamaindex', 'chroma'], default='llamaindex',
+                              help="Stack for the cold process; match the running server")
+    bench_parser.add_argument('--runs', type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == 'bench':
+        bench(args.url, args.question, args.model, args.runs, args.stack)
+        return
+    if args.command == 'once':
+        service = make_service(args)
+        for message in service.answer(args.question):
+            print(json.dumps(message), flush=True)
+        return
+    if args.command is None:
+        args = serve_parser.parse_args([])
+
+    service = make_service(args)
+    print(f"Warm after {service.startup['total']:.2f}s "
+          f"(imports {service.startup['imports']:.2f}s, embedder {service.startup['embedder']:.2f}s, "
+          f"index {service.startup['index']:.2f}s)")
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Serving RAG queries on http://{args.host}:{args.port}/query")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping server...")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import math
+import time
+from collections import OrderedDict
+
+# Cache answers by question meaning rather than exact text, so a repeated
+# question skips retrieval and generation altogether.
+
+
+def cosine_similarity(a, b):
+    """Cosine similarity of two equal-length vectors."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+class SemanticCache:
+    """LRU + TTL cache keyed on question embeddings.
+
+    `embed` maps a question string to a vector. A lookup hits when the most
+    similar live entry scores at or above `threshold`.
+    """
+
+    def __init__(self, embed, threshold=0.9, ttl=3600.0, max_entries=256, clock=time.monotonic):
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.next_key = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, question, embedding=None, field=None):
+        """Return the cached entry dict for a similar question, or None.
+
+        With `field` ('context' or 'answer') only entries holding it match.
+        """
+        if embedding is None:
+            embedding = list(self.embed(question))
+        self._expire()
+
+        best_key, best_score = None, -1.0
+        for key, entry in self.entries.items():
+            if field is not None and entry[field] is None:
+                continue
+            score = cosine_similarity(embedding, entry['embedding'])
+            if score > best_score:
+                best_key, best_score = key, score
+
+        if best_key is None or best_score < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(best_key)
+        entry = self.entries[best_key]
+        return {
+            'question': entry['question'],
+            'context': entry['context'],
+            'answer': entry['answer'],
+            'similarity': best_score,
+        }
+
+    def store(self, question, context=None, answer=None, embedding=None):
+        """Cache retrieved context and/or the final answer for a question."""
+        if embedding is None:
+            embedding = list(self.embed(question))
+        self.entries[self.next_key] = {
+            'question': question,
+            'embedding': list(embedding),
+            'context': context,
+            'answer': answer,
+            'expires_at': self.clock() + self.ttl,
+        }
+        self.next_key += 1
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, question, compute):
+        """Return (answer, hit) using `compute(question)` on a miss."""
+        embedding = list(self.embed(question))
+        entry = self.lookup(question, embedding=embedding, field='answer')
+        if entry is not None:
+            return entry['answer'], True
+        answer = compute(question)
+        self.store(question, answer=answer, embedding=embedding)
+        return answer, False
+
+    def _expire(self):
+        now = self.clock()
+        expired = [key for key, entry in self.entries.items() if entry['expires_at'] <= now]
+        for key in expired:
+            del self.entries[key]
+            self.expirations += 1
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """Return hit/miss counters for reporting."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'entries': len(self.entries),
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }